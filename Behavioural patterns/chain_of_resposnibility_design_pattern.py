@@ -14,44 +14,377 @@ Client: The client initiates the request and starts the chain by passing the req
 The Chain of Responsibility pattern promotes loose coupling between the sender of a request and its receiver, as the client does not need to know which handler will process the request.
 """
 
+import asyncio
+import random
+import sys
+import time
+
 # Handler Interface
 class Handler:
+    next_handler = None
+    key = None  # Exact request this handler matches, if it matches on equality alone
+    exclusive = False  # True if no other handler in the chain accepts the same requests
+
     def set_next(self, handler):
         pass
 
     def handle_request(self, request):
         pass
 
+    def handle_requests(self, requests):
+        for request in requests:
+            yield self.handle_request(request)
+
+    def can_handle(self, request):
+        return request == self.key
+
+    def process(self, request):
+        pass
+
 # Concrete Handlers
 class ConcreteHandlerA(Handler):
+    key = "A"
+
     def set_next(self, handler):
         self.next_handler = handler
 
     def handle_request(self, request):
-        if request == "A":
-            print("ConcreteHandlerA handles the request.")
+        if self.can_handle(request):
+            return self.process(request)
         elif self.next_handler:
-            self.next_handler.handle_request(request)
+            return self.next_handler.handle_request(request)
+
+    def process(self, request):
+        print("ConcreteHandlerA handles the request.")
 
 class ConcreteHandlerB(Handler):
+    key = "B"
+
     def set_next(self, handler):
         self.next_handler = handler
 
     def handle_request(self, request):
-        if request == "B":
-            print("ConcreteHandlerB handles the request.")
+        if self.can_handle(request):
+            return self.process(request)
         elif self.next_handler:
-            self.next_handler.handle_request(request)
+            return self.next_handler.handle_request(request)
+
+    def process(self, request):
+        print("ConcreteHandlerB handles the request.")
 
 class ConcreteHandlerC(Handler):
+    key = "C"
+
     def set_next(self, handler):
         self.next_handler = handler
 
     def handle_request(self, request):
-        if request == "C":
-            print("ConcreteHandlerC handles the request.")
+        if self.can_handle(request):
+            return self.process(request)
         elif self.next_handler:
-            self.next_handler.handle_request(request)
+            return self.next_handler.handle_request(request)
+
+    def process(self, request):
+        print("ConcreteHandlerC handles the request.")
+
+# Concrete Handler matching a configurable exact key
+class KeyHandler(Handler):
+    def __init__(self, key):
+        self.key = key
+
+    def set_next(self, handler):
+        self.next_handler = handler
+
+    def handle_request(self, request):
+        if self.can_handle(request):
+            return self.process(request)
+        elif self.next_handler:
+            return self.next_handler.handle_request(request)
+
+    def process(self, request):
+        return self.key
+
+# Concrete Handler matching with an arbitrary predicate
+class PredicateHandler(Handler):
+    def __init__(self, predicate, name, exclusive=False):
+        self.predicate = predicate
+        self.name = name
+        self.exclusive = exclusive
+
+    def set_next(self, handler):
+        self.next_handler = handler
+
+    def handle_request(self, request):
+        if self.can_handle(request):
+            return self.process(request)
+        elif self.next_handler:
+            return self.next_handler.handle_request(request)
+
+    def can_handle(self, request):
+        return self.predicate(request)
+
+    def process(self, request):
+        return self.name
+
+# Compiled Chain
+class CompiledChain:
+    """
+    Flattened, read-only view of a handler chain.
+
+    Handlers with a key go into a dict keyed by that key, every other handler is kept in
+    chain order and tried iteratively, so the first matching handler still wins and no
+    recursion is involved. Recompile after changing the chain.
+    """
+
+    def __init__(self, head):
+        self._dispatch = {}
+        self._predicates = []
+        handler = head
+        position = 0
+        while handler is not None:
+            if handler.key is not None:
+                self._dispatch.setdefault(handler.key, (position, handler))
+            else:
+                self._predicates.append((position, handler))
+            handler = handler.next_handler
+            position += 1
+        self._length = position
+        self.hits = {}
+
+    def __len__(self):
+        return self._length
+
+    def resolve(self, request):
+        try:
+            keyed = self._dispatch.get(request)
+        except TypeError:  # Unhashable requests can only match predicate handlers
+            keyed = None
+        limit = keyed[0] if keyed else self._length
+        for position, handler in self._predicates:
+            if position > limit:
+                break
+            if handler.can_handle(request):
+                return handler
+        return keyed[1] if keyed else None
+
+    def handle_request(self, request):
+        handler = self.resolve(request)
+        if handler is not None:
+            return handler.process(request)
+
+    def handle_requests(self, requests):
+        hits = self.hits
+        for request in requests:
+            handler = self.resolve(request)
+            if handler is None:
+                yield None
+            else:
+                hits[handler] = hits.get(handler, 0) + 1
+                yield handler.process(request)
+
+# Adaptive Chain
+class AdaptiveChain:
+    """
+    Handler chain walked iteratively that counts hits per handler and can reorder itself.
+
+    With policy="move_to_front" a handler that handles a request moves towards the front,
+    with policy="frequency" it only moves ahead of handlers with fewer hits. A handler never
+    moves past one it may overlap with (see _commutes), so results do not change. The order
+    lives in this object; the linked handlers themselves are left untouched.
+    """
+
+    POLICIES = (None, "move_to_front", "frequency")
+
+    def __init__(self, head, policy=None):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown reordering policy: {policy!r}")
+        self.policy = policy
+        self._handlers = []
+        handler = head
+        while handler is not None:
+            self._handlers.append(handler)
+            handler = handler.next_handler
+        self.hits = dict.fromkeys(self._handlers, 0)
+        self.probes = 0  # Total number of handlers asked, to measure traversal length
+
+    def __len__(self):
+        return len(self._handlers)
+
+    def handlers(self):
+        return list(self._handlers)
+
+    @staticmethod
+    def _commutes(first, second):
+        if first.exclusive or second.exclusive:
+            return True
+        return first.key is not None and second.key is not None and first.key != second.key
+
+    def _promote(self, index):
+        handlers = self._handlers
+        handler = handlers[index]
+        hits = self.hits[handler]
+        while index > 0:
+            previous = handlers[index - 1]
+            if not self._commutes(previous, handler):
+                break
+            if self.policy == "frequency" and self.hits[previous] >= hits:
+                break
+            handlers[index] = previous
+            index -= 1
+        handlers[index] = handler
+
+    def handle_request(self, request):
+        for index, handler in enumerate(self._handlers):
+            if handler.can_handle(request):
+                self.probes += index + 1
+                self.hits[handler] += 1
+                if self.policy is not None:
+                    self._promote(index)
+                return handler.process(request)
+        self.probes += len(self._handlers)
+
+    def handle_requests(self, requests):
+        for request in requests:
+            yield self.handle_request(request)
+
+# Async Handler Interface
+class AsyncHandler:
+    next_handler = None
+    key = None
+    timeout = None  # Seconds allowed for process(), None to use the runner's default
+
+    def set_next(self, handler):
+        self.next_handler = handler
+
+    def can_handle(self, request):
+        return request == self.key
+
+    async def process(self, request):
+        pass
+
+# Async Chain Runner
+class AsyncChainRunner:
+    """
+    Runs requests through a chain of AsyncHandlers concurrently.
+
+    At most `concurrency` requests are in flight at once. Each hop that processes a request
+    is bounded by the handler's timeout (or the runner's), and a timed out hop raises
+    TimeoutError for that request. If handle_requests() is cancelled or fails, every request
+    still in flight is cancelled before it returns.
+    """
+
+    def __init__(self, head, concurrency=100, timeout=None):
+        self._head = head
+        self._semaphore = asyncio.BoundedSemaphore(concurrency)
+        self.timeout = timeout
+
+    async def handle_request(self, request):
+        async with self._semaphore:
+            handler = self._head
+            while handler is not None:
+                if handler.can_handle(request):
+                    timeout = handler.timeout if handler.timeout is not None else self.timeout
+                    return await asyncio.wait_for(handler.process(request), timeout)
+                handler = handler.next_handler
+
+    async def handle_requests(self, requests, return_exceptions=False):
+        tasks = [asyncio.create_task(self.handle_request(request)) for request in requests]
+        try:
+            return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+# Concrete Handlers standing in for handlers that wait on I/O
+class SimulatedIOHandler(KeyHandler):
+    def __init__(self, key, latency):
+        super().__init__(key)
+        self.latency = latency
+
+    def process(self, request):
+        time.sleep(self.latency)
+        return self.key
+
+class AsyncSimulatedIOHandler(AsyncHandler):
+    def __init__(self, key, latency):
+        self.key = key
+        self.latency = latency
+
+    async def process(self, request):
+        await asyncio.sleep(self.latency)
+        return self.key
+
+# Helper function to link handlers in order and return the head of the chain
+def build_chain(handlers):
+    for handler, next_handler in zip(handlers, handlers[1:]):
+        handler.set_next(next_handler)
+    return handlers[0]
+
+# Benchmark: recursive chain walk vs. compiled chain
+def benchmark_compiled_chain(sizes=(10, 1_000, 100_000), requests=10_000):
+    for size in sizes:
+        head = build_chain([KeyHandler(f"key-{i}") for i in range(size)])
+        keys = [f"key-{random.randrange(size)}" for _ in range(requests)]
+
+        start = time.perf_counter()
+        try:
+            for key in keys:
+                head.handle_request(key)
+            recursive = f"{requests / (time.perf_counter() - start):>14,.0f} req/s"
+        except RecursionError:
+            recursive = f"{'RecursionError':>20}"
+
+        start = time.perf_counter()
+        chain = CompiledChain(head)
+        compile_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for key in keys:
+            chain.handle_request(key)
+        compiled = requests / (time.perf_counter() - start)
+
+        print(f"{size:>8,} handlers | recursive: {recursive} | "
+              f"compiled: {compiled:>14,.0f} req/s (compiled in {compile_time * 1000:.1f} ms)")
+
+# Benchmark: static vs. adaptive handler order on a skewed workload
+def benchmark_adaptive_chain(size=1_000, requests=100_000, skew=1.2):
+    weights = [1 / (rank + 1) ** skew for rank in range(size)]
+    hot_keys = random.sample(range(size), size)  # Hot handlers are spread along the chain
+    workload = random.choices(hot_keys, weights=weights, k=requests)
+
+    for policy in AdaptiveChain.POLICIES:
+        head = build_chain([
+            PredicateHandler(lambda request, i=i: request == i, f"handler-{i}", exclusive=True)
+            for i in range(size)
+        ])
+        chain = AdaptiveChain(head, policy=policy)
+        start = time.perf_counter()
+        for _ in chain.handle_requests(workload):
+            pass
+        elapsed = time.perf_counter() - start
+        print(f"policy={str(policy):<14} avg handlers asked: {chain.probes / requests:>8.1f} | "
+              f"{requests / elapsed:>12,.0f} req/s")
+
+# Benchmark: synchronous handle_request vs. async chain runner on I/O-bound handlers
+def benchmark_async_chain(requests=2_000, handlers=10, latency=0.001, concurrency=(10, 100, 1_000)):
+    keys = [f"key-{random.randrange(handlers)}" for _ in range(requests)]
+
+    head = build_chain([SimulatedIOHandler(f"key-{i}", latency) for i in range(handlers)])
+    start = time.perf_counter()
+    for key in keys:
+        head.handle_request(key)
+    print(f"sync handle_request:           {requests / (time.perf_counter() - start):>10,.0f} req/s")
+
+    async_head = build_chain([AsyncSimulatedIOHandler(f"key-{i}", latency) for i in range(handlers)])
+    for limit in concurrency:
+        async def run():
+            runner = AsyncChainRunner(async_head, concurrency=limit, timeout=1.0)
+            start = time.perf_counter()
+            await runner.handle_requests(keys)
+            return time.perf_counter() - start
+
+        elapsed = asyncio.run(run())
+        print(f"async runner, concurrency {limit:>5}: {requests / elapsed:>10,.0f} req/s")
 
 # Client
 if __name__ == "__main__":
@@ -67,8 +400,30 @@ if __name__ == "__main__":
     handler_a.handle_request("B")  # Output: ConcreteHandlerB handles the request.
     handler_a.handle_request("C")  # Output: ConcreteHandlerC handles the request.
 
+    # The same chain compiled into a dispatch table
+    compiled_chain = CompiledChain(handler_a)
+    compiled_chain.handle_request("B")  # Output: ConcreteHandlerB handles the request.
+    compiled_chain.handle_request("D")  # Unhandled, nothing is printed
+
+    # Streaming a batch of requests through a chain that reorders itself
+    adaptive_chain = AdaptiveChain(handler_a, policy="move_to_front")
+    for _ in adaptive_chain.handle_requests(["C", "C", "A"]):
+        pass
+    print({type(handler).__name__: hits for handler, hits in adaptive_chain.hits.items()})
+
+    if "--benchmark" in sys.argv[1:]:
+        benchmark_compiled_chain()
+        benchmark_adaptive_chain()
+        benchmark_async_chain()
+
 
 
 """
+In this example, each concrete handler checks whether it can handle the request and otherwise forwards it to the next handler. The client only talks to the first handler in the chain.
+
+Walking the chain costs one call per handler, and because every hop is a nested call, a long enough chain exceeds Python's recursion limit. CompiledChain flattens the chain once: handlers that match on an exact key are stored in a dict, while predicate handlers are tried in chain order without recursion. The first matching handler still wins, so the result is the same as walking the chain. Run the script with --benchmark to compare both at different chain lengths.
+
+For streams of requests, handle_requests() yields results lazily and the chains count how often each handler was hit. AdaptiveChain can additionally move frequently hit handlers towards the front. It only swaps two handlers when they cannot both accept the same request (distinct keys, or a handler marked exclusive), so reordering never changes which handler processes a request.
 
+Handlers that wait on I/O can derive from AsyncHandler instead. AsyncChainRunner walks the same kind of chain for many requests at once, limits how many are in flight with a semaphore, applies a timeout to every hop and cancels outstanding requests when the batch is cancelled.
 """
@@ -6,30 +6,68 @@ The Command design pattern is a behavioral pattern that converts requests or sim
 Let's create an example of a simple command design pattern for a remote control that operates electronic devices (e.g., TV, Stereo). We'll have a Command interface, concrete command classes (TurnOnCommand and TurnOffCommand), and an Invoker class (remote control) that triggers the commands.
 """
 
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+import threading
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
 
 # Command interface
 class Command(ABC):
+    opcode = None  # Identifies the command type in a CommandJournal, None if it cannot be journaled
+
     @abstractmethod
     def execute(self):
         pass
 
+    def coalesce_key(self):
+        # Commands sharing a key overwrite each other's effect, so only the last one matters.
+        # None means the command always has to run.
+        return None
+
+    def shard_key(self):
+        # Commands with the same shard key run in submission order. None puts the command
+        # on the shard shared by all commands that do not name a receiver.
+        return None
+
 # Concrete Command class for turning on a device
 class TurnOnCommand(Command):
+    opcode = 1
+
     def __init__(self, device):
         self.device = device
 
     def execute(self):
         self.device.turn_on()
 
+    def coalesce_key(self):
+        return (self.device, "power")
+
+    def shard_key(self):
+        return self.device
+
 # Concrete Command class for turning off a device
 class TurnOffCommand(Command):
+    opcode = 2
+
     def __init__(self, device):
         self.device = device
 
     def execute(self):
         self.device.turn_off()
 
+    def coalesce_key(self):
+        return (self.device, "power")
+
+    def shard_key(self):
+        return self.device
+
 # Receiver class (Electronic devices)
 class Television:
     def turn_on(self):
@@ -45,20 +83,296 @@ class Stereo:
     def turn_off(self):
         print("Stereo is turned off.")
 
+# Receiver class that only counts how often it is called
+class CountingDevice:
+    def __init__(self, latency=0):
+        self.calls = 0
+        self.latency = latency  # Simulated time the device takes to respond
+
+    def turn_on(self):
+        if self.latency:
+            time.sleep(self.latency)
+        self.calls += 1
+
+    def turn_off(self):
+        if self.latency:
+            time.sleep(self.latency)
+        self.calls += 1
+
+# Helper function to drop commands whose effect is overwritten later in the batch
+def coalesce_commands(commands):
+    # Surviving commands keep the position of their last occurrence. A command without a
+    # coalesce key may depend on anything before it, so nothing is collapsed across it.
+    reduced = []
+    pending = {}
+    for command in commands:
+        key = command.coalesce_key()
+        if key is None:
+            pending.clear()
+        elif key in pending:
+            reduced[pending[key]] = None
+        if key is not None:
+            pending[key] = len(reduced)
+        reduced.append(command)
+    return [command for command in reduced if command is not None]
+
+# Executor running commands for different receivers in parallel
+class ShardedCommandExecutor:
+    """
+    Runs commands on a fixed set of single-threaded shards. Shard keys are assigned to
+    shards round-robin the first time they are seen.
+
+    Each shard is a FIFO queue, so all commands for one receiver run in the order they were
+    submitted, while receivers on different shards run in parallel. A thread pool is used
+    because commands act on the receivers living in this process.
+    """
+
+    def __init__(self, shards=8):
+        self._shards = [ThreadPoolExecutor(max_workers=1) for _ in range(shards)]
+        self._assignment = {}
+        self._next_shard = count()
+        self._lock = threading.Lock()
+
+    def submit(self, command):
+        key = command.shard_key()
+        with self._lock:
+            if key not in self._assignment:
+                self._assignment[key] = next(self._next_shard) % len(self._shards)
+            shard = self._shards[self._assignment[key]]
+            return shard.submit(command.execute)
+
+    def drain(self):
+        # A no-op finishes on a shard only after everything submitted to it before
+        barrier = [shard.submit(lambda: None) for shard in self._shards]
+        for future in barrier:
+            future.result()
+
+    def shutdown(self, wait=True):
+        for shard in self._shards:
+            shard.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+# Append-only binary log of executed commands
+class CommandJournal:
+    """
+    Writes commands as fixed-size records (opcode, device index) to an append-only file.
+
+    Devices are identified by their position in the `devices` list, so the same list has to
+    be passed to replay(). Records are buffered and written with a single fsync once
+    `group_size` of them are pending (group commit); commit() forces this early. Commands
+    that were executed but not yet committed are lost if the process crashes. Appending is
+    thread-safe, so executor threads can journal the commands they finish.
+    """
+
+    RECORD = struct.Struct("<BI")
+    COMMAND_TYPES = {TurnOnCommand.opcode: TurnOnCommand, TurnOffCommand.opcode: TurnOffCommand}
+
+    def __init__(self, path, devices, group_size=1):
+        self.path = path
+        self.group_size = group_size
+        self._device_ids = {device: index for index, device in enumerate(devices)}
+        self._file = open(path, "ab")
+        # Drop a torn record left by a crash, or every record appended after it would be misaligned
+        size = self._file.tell()
+        if size % self.RECORD.size:
+            self._file.truncate(size - size % self.RECORD.size)
+        self._buffer = bytearray()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def append(self, command):
+        if command.opcode is None:
+            raise ValueError(f"{type(command).__name__} cannot be journaled")
+        record = self.RECORD.pack(command.opcode, self._device_ids[command.device])
+        with self._lock:
+            self._buffer += record
+            self._pending += 1
+            if self._pending >= self.group_size:
+                self._commit()
+
+    def commit(self):
+        with self._lock:
+            self._commit()
+
+    def _commit(self):
+        if self._pending:
+            self._file.write(self._buffer)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._buffer.clear()
+            self._pending = 0
+
+    def close(self):
+        with self._lock:
+            self._commit()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @classmethod
+    def records(cls, path):
+        # Yields (opcode, device index) pairs; a torn record at the end of the file is ignored
+        if os.path.getsize(path) == 0:
+            return
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            with memoryview(data) as view:
+                with view[:len(view) - len(view) % cls.RECORD.size] as complete:
+                    yield from cls.RECORD.iter_unpack(complete)
+
+    @classmethod
+    def replay(cls, path, devices):
+        # Re-executes every journaled command and returns how many were replayed
+        command_types = cls.COMMAND_TYPES
+        replayed = 0
+        for opcode, device_id in cls.records(path):
+            command_types[opcode](devices[device_id]).execute()
+            replayed += 1
+        return replayed
+
 # Invoker class (Remote Control)
 class RemoteControl:
-    def __init__(self):
+    def __init__(self, executor=None):
         self._commands = {}
+        self._macro = None
+        self._executor = executor
 
     def add_command(self, command_name, command):
         self._commands[command_name] = command
 
     def press_button(self, command_name):
         if command_name in self._commands:
-            self._commands[command_name].execute()
+            if self._macro is not None:
+                self._macro.append(self._commands[command_name])
+            else:
+                return self._execute(self._commands[command_name])
         else:
             print("Invalid command!")
 
+    def _execute(self, command):
+        # Returns a future when the remote control runs commands on an executor
+        if self._executor is not None:
+            return self._executor.submit(command)
+        command.execute()
+
+    def drain(self):
+        # Blocks until every command submitted to the executor so far has finished
+        if self._executor is not None:
+            self._executor.drain()
+
+    def start_macro(self):
+        # Buttons pressed from now on are queued until run_macro() is called
+        self._macro = []
+
+    def run_macro(self):
+        # Executes the queued commands after coalescing and returns how many were skipped
+        queued, self._macro = self._macro or [], None
+        batch = coalesce_commands(queued)
+        for command in batch:
+            self._execute(command)
+        return len(queued) - len(batch)
+
+# Invoker that journals every command it executes
+class JournalingRemoteControl(RemoteControl):
+    # Commands are journaled only once they have run without raising. With an executor
+    # that happens on the shard thread, so queued or failed commands never reach the log.
+    def __init__(self, journal, executor=None):
+        super().__init__(executor=executor)
+        self._journal = journal
+
+    def _execute(self, command):
+        result = super()._execute(command)
+        if result is None:
+            self._journal.append(command)
+        else:
+            result.add_done_callback(lambda future: self._journal_if_executed(future, command))
+        return result
+
+    def _journal_if_executed(self, future, command):
+        if not future.cancelled() and future.exception() is None:
+            self._journal.append(command)
+
+# Benchmark: receiver calls with and without coalescing on bursts of toggles
+def benchmark_coalescing(devices=10, bursts=1_000, burst_size=50):
+    def run(coalesce):
+        receivers = [CountingDevice() for _ in range(devices)]
+        remote = RemoteControl()
+        for index, device in enumerate(receivers):
+            remote.add_command(f"on_{index}", TurnOnCommand(device))
+            remote.add_command(f"off_{index}", TurnOffCommand(device))
+        rng = random.Random(42)
+        start = time.perf_counter()
+        for _ in range(bursts):
+            if coalesce:
+                remote.start_macro()
+            for _ in range(burst_size):
+                remote.press_button(f"{rng.choice(('on', 'off'))}_{rng.randrange(devices)}")
+            if coalesce:
+                remote.run_macro()
+        return sum(device.calls for device in receivers), time.perf_counter() - start
+
+    immediate_calls, immediate_time = run(coalesce=False)
+    coalesced_calls, coalesced_time = run(coalesce=True)
+    print(f"immediate: {immediate_calls:>10,} receiver calls in {immediate_time:.3f} s")
+    print(f"coalesced: {coalesced_calls:>10,} receiver calls in {coalesced_time:.3f} s "
+          f"({1 - coalesced_calls / immediate_calls:.1%} saved)")
+
+# Benchmark: serial remote control vs. sharded executor as the number of devices grows
+def benchmark_sharded_executor(device_counts=(1, 2, 4, 8, 16), commands=1_600, latency=0.001, shards=16):
+    for count in device_counts:
+        results = []
+        for executor in (None, ShardedCommandExecutor(shards=shards)):
+            receivers = [CountingDevice(latency=latency) for _ in range(count)]
+            remote = RemoteControl(executor=executor)
+            for index, device in enumerate(receivers):
+                remote.add_command(f"on_{index}", TurnOnCommand(device))
+            start = time.perf_counter()
+            for number in range(commands):
+                remote.press_button(f"on_{number % count}")
+            remote.drain()
+            results.append(commands / (time.perf_counter() - start))
+            if executor is not None:
+                executor.shutdown()
+        print(f"{count:>3} devices | serial: {results[0]:>8,.0f} cmd/s | "
+              f"sharded: {results[1]:>8,.0f} cmd/s")
+
+# Benchmark: journal writes with and without group commit, and replay speed
+def benchmark_journal(writes=5_000, group_sizes=(1, 64, 1_024), replay_entries=10_000_000):
+    device = CountingDevice()
+    command = TurnOnCommand(device)
+    with tempfile.TemporaryDirectory() as directory:
+        for group_size in group_sizes:
+            path = os.path.join(directory, f"journal-{group_size}.log")
+            with CommandJournal(path, [device], group_size=group_size) as journal:
+                start = time.perf_counter()
+                for _ in range(writes):
+                    journal.append(command)
+                journal.commit()
+                elapsed = time.perf_counter() - start
+            print(f"group size {group_size:>5}: {writes / elapsed:>12,.0f} writes/s")
+
+        path = os.path.join(directory, "replay.log")
+        with CommandJournal(path, [device], group_size=100_000) as journal:
+            for _ in range(replay_entries):
+                journal.append(command)
+        start = time.perf_counter()
+        for _ in CommandJournal.records(path):
+            pass
+        elapsed = time.perf_counter() - start
+        print(f"decode {replay_entries:,} entries: {elapsed:.2f} s ({replay_entries / elapsed:,.0f} entries/s)")
+        start = time.perf_counter()
+        CommandJournal.replay(path, [device])
+        elapsed = time.perf_counter() - start
+        print(f"replay {replay_entries:,} entries: {elapsed:.2f} s ({replay_entries / elapsed:,.0f} entries/s)")
+
 # Example usage
 if __name__ == "__main__":
     tv = Television()
@@ -81,6 +395,29 @@ if __name__ == "__main__":
     remote.press_button("off_stereo")# Output: Stereo is turned off.
     remote.press_button("invalid")   # Output: Invalid command!
 
+    # Queued mode: redundant toggles are collapsed before reaching the devices
+    remote.start_macro()
+    remote.press_button("on_tv")
+    remote.press_button("off_tv")
+    remote.press_button("on_tv")
+    remote.press_button("on_stereo")
+    skipped = remote.run_macro()     # Output: TV is turned on. Stereo is turned on.
+    print(f"Skipped {skipped} redundant commands.")
+
+    # Executor mode: TV and stereo commands run in parallel, each device in order
+    with ShardedCommandExecutor(shards=2) as executor:
+        parallel_remote = RemoteControl(executor=executor)
+        parallel_remote.add_command("on_tv", turn_on_tv)
+        parallel_remote.add_command("on_stereo", turn_on_stereo)
+        parallel_remote.press_button("on_tv")  # Returns a Future
+        parallel_remote.press_button("on_stereo")
+        parallel_remote.drain()
+
+    if "--benchmark" in sys.argv[1:]:
+        benchmark_coalescing()
+        benchmark_sharded_executor()
+        benchmark_journal()
+
 
 
 
@@ -90,5 +427,11 @@ In this example, the Command interface defines the execute() method that encapsu
 
 The RemoteControl class acts as the invoker and maintains a dictionary of commands. It can add new commands and trigger the execution of a command when a button is pressed.
 
-By using the Command design pattern, the remote control can easily support different commands, and it is also possible to queue or undo commands if needed. The pattern promotes flexibility and extensibility in handling user actions.
+By using the Command design pattern, the remote control can easily support different commands, and it is also possible to queue or undo commands if needed.
+
+For example, after start_macro() the remote control queues pressed buttons instead of executing them. run_macro() first removes commands whose effect is overwritten later in the batch: turning the TV on, off and on again only reaches the TV once. Commands opt in through coalesce_key(), and a command without a key is never reordered or skipped.
+
+A remote control created with a ShardedCommandExecutor submits commands instead of running them on the caller's thread and returns a future for each one. Commands are assigned to single-threaded shards by receiver, so every device still sees its commands in order while different devices are served in parallel. drain() waits until everything submitted so far has run.
+
+JournalingRemoteControl additionally records every command in a CommandJournal, a compact append-only file of (opcode, device) records. Flushing to disk is the expensive part, so the journal can group many commands into one fsync. After a crash, CommandJournal.replay() memory-maps the file and re-executes the recorded commands against the same list of devices. The pattern promotes flexibility and extensibility in handling user actions.
 """
@@ -4,7 +4,22 @@ Iterator design pattern:
 The Iterator design pattern is a behavioral pattern that provides a way to access elements of a collection sequentially without exposing the underlying representation of the collection. It allows you to traverse the elements of a collection without knowing the internal structure of the collection.
 """
 
+import mmap
+import os
+import sys
+import tempfile
+import threading
+import time
 from abc import ABC, abstractmethod
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, only ArrayAggregate.as_numpy() needs it
+    np = None
 
 # Iterator interface
 class Iterator(ABC):
@@ -16,6 +31,108 @@ class Iterator(ABC):
     def next(self):
         pass
 
+    # Python's iterator protocol, so iterators also work in for loops
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self.next()
+
+    # Lazy combinators. Each returns a new iterator and pulls items from this one only on
+    # demand, so a chain of them is a single pass without intermediate lists. The source
+    # iterator should not be advanced directly once it is part of a pipeline.
+    def _items(self):
+        return self
+
+    def map(self, function):
+        return PipelineIterator(map(function, self._items()))
+
+    def filter(self, predicate):
+        return PipelineIterator(filter(predicate, self._items()))
+
+    def take(self, n):
+        return PipelineIterator(islice(self._items(), n))
+
+    def window(self, size):
+        if size < 1:
+            raise ValueError("Window size must be at least 1")
+        return PipelineIterator(_windows(self._items(), size))
+
+    def chunk(self, size):
+        if size < 1:
+            raise ValueError("Chunk size must be at least 1")
+        return PipelineIterator(_chunks(self._items(), size))
+
+    def parallel_map(self, function, chunk_size=1_024, workers=None, executor=None):
+        # Maps chunks of items on a process pool and yields the results in input order. At most
+        # two chunks per worker are in flight, which bounds memory use. `function` must be
+        # picklable, i.e. defined at module level.
+        return PipelineIterator(_parallel_map(self._items(), function, chunk_size, workers, executor))
+
+# Helper generators backing the combinators
+def _windows(items, size):
+    window = deque(islice(items, size), maxlen=size)
+    if len(window) == size:
+        yield tuple(window)
+    for item in items:
+        window.append(item)
+        yield tuple(window)
+
+def _chunks(items, size):
+    while chunk := list(islice(items, size)):
+        yield chunk
+
+def _map_chunk(function, chunk):
+    return [function(item) for item in chunk]
+
+def _parallel_map(items, function, chunk_size, workers, executor):
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    max_pending = 2 * (workers or os.cpu_count() or 1)
+    pending = deque()
+    try:
+        for chunk in _chunks(items, chunk_size):
+            pending.append(executor.submit(_map_chunk, function, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+
+# Concrete Iterator class wrapping any Python iterable, used for pipeline stages
+class PipelineIterator(Iterator):
+    _EMPTY = object()
+
+    def __init__(self, iterable):
+        self._source = iter(iterable)
+        self._lookahead = self._EMPTY
+
+    def has_next(self):
+        if self._lookahead is self._EMPTY:
+            self._lookahead = next(self._source, self._EMPTY)
+        return self._lookahead is not self._EMPTY
+
+    def next(self):
+        if self._lookahead is not self._EMPTY:
+            value, self._lookahead = self._lookahead, self._EMPTY
+            return value
+        return next(self._source)
+
+    __next__ = next
+
+    def _items(self):
+        # Hands the underlying iterable to the next stage so that builtins like map() and
+        # filter() pull from it directly, without a Python-level call per item
+        if self._lookahead is self._EMPTY:
+            return self._source
+        lookahead, self._lookahead = self._lookahead, self._EMPTY
+        return chain((lookahead,), self._source)
+
 # Concrete Iterator class for list traversal
 class ListIterator(Iterator):
     def __init__(self, collection):
@@ -26,12 +143,44 @@ class ListIterator(Iterator):
         return self._index < len(self._collection)
 
     def next(self):
-        if self.has_next():
+        try:
             value = self._collection[self._index]
-            self._index += 1
-            return value
-        else:
+        except IndexError:
+            raise StopIteration() from None
+        self._index += 1
+        return value
+
+    __next__ = next
+
+    def next_batch(self, n):
+        # Returns up to n items as a slice of the collection, empty once exhausted. Slicing a
+        # list copies the references; slicing a memoryview returns a view without copying.
+        start = self._index
+        self._index = min(start + n, len(self._collection))
+        return self._collection[start:self._index]
+
+# Concrete Iterator class that stops at a fixed end index
+class SnapshotIterator(ListIterator):
+    def __init__(self, collection, end):
+        super().__init__(collection)
+        self._end = end
+
+    def has_next(self):
+        return self._index < self._end
+
+    def next(self):
+        if self._index >= self._end:
             raise StopIteration()
+        value = self._collection[self._index]
+        self._index += 1
+        return value
+
+    __next__ = next
+
+    def next_batch(self, n):
+        start = self._index
+        self._index = min(start + n, self._end)
+        return self._collection[start:self._index]
 
 # Aggregate interface
 class Aggregate(ABC):
@@ -47,9 +196,305 @@ class ListAggregate(Aggregate):
     def add_item(self, item):
         self._items.append(item)
 
+    def extend(self, items):
+        self._items.extend(items)
+
     def get_iterator(self):
         return ListIterator(self._items)
 
+    def __iter__(self):
+        return self.get_iterator()
+
+# Concrete Aggregate class giving every iterator a snapshot while other threads append
+class VersionedListAggregate(Aggregate):
+    """
+    Append-only list whose length is its version. Items never move or change once added,
+    so an iterator only has to remember how many items existed when it was created to see
+    a consistent snapshot: get_iterator() is O(1), nothing is copied and readers never take
+    the lock. Writers take a lock so the version is published only after the item is stored.
+    """
+
+    def __init__(self):
+        self._items = []
+        self._version = 0
+        self._write_lock = threading.Lock()
+
+    def add_item(self, item):
+        with self._write_lock:
+            self._items.append(item)
+            self._version += 1
+
+    def extend(self, items):
+        with self._write_lock:
+            self._items.extend(items)
+            self._version = len(self._items)
+
+    @property
+    def version(self):
+        return self._version
+
+    def get_iterator(self):
+        return SnapshotIterator(self._items, self._version)
+
+    def __iter__(self):
+        return self.get_iterator()
+
+# Concrete Aggregate class that copies its items under a lock for every iterator
+class LockedListAggregate(Aggregate):
+    def __init__(self):
+        self._items = []
+        self._lock = threading.Lock()
+
+    def add_item(self, item):
+        with self._lock:
+            self._items.append(item)
+
+    def extend(self, items):
+        with self._lock:
+            self._items.extend(items)
+
+    def get_iterator(self):
+        with self._lock:
+            return ListIterator(list(self._items))
+
+    def __iter__(self):
+        return self.get_iterator()
+
+# Concrete Aggregate class for the lines of a text file, read lazily
+class FileAggregate(Aggregate):
+    def __init__(self, path):
+        self.path = path
+
+    def _lines(self):
+        with open(self.path) as file:
+            yield from file
+
+    def get_iterator(self):
+        return PipelineIterator(self._lines())
+
+    def __iter__(self):
+        return self.get_iterator()
+
+# Concrete Aggregate class for fixed-width numbers stored in a typed array
+class ArrayAggregate(Aggregate):
+    """
+    Stores numbers unboxed in an array.array with the given typecode ("d" for float64, "q" for
+    int64, ...). Iterators walk a memoryview of the array, so next_batch() returns views that
+    share the array's memory. The array cannot grow while such a view is alive: add_item()
+    raises BufferError until the iterators and batches are released.
+    """
+
+    def __init__(self, typecode="d"):
+        self._items = array(typecode)
+
+    def add_item(self, item):
+        self._items.append(item)
+
+    def extend(self, items):
+        self._items.extend(items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def nbytes(self):
+        return len(self._items) * self._items.itemsize
+
+    def get_iterator(self):
+        return ListIterator(memoryview(self._items))
+
+    def __iter__(self):
+        return self.get_iterator()
+
+    def as_numpy(self):
+        # Zero-copy NumPy array over the same memory
+        if np is None:
+            raise ImportError("as_numpy() requires NumPy")
+        return np.frombuffer(self._items, dtype=self._items.typecode)
+
+# Concrete Aggregate class for fixed-width numbers stored in a memory-mapped file
+class MmapAggregate(Aggregate):
+    """
+    Appends numbers to a binary file and iterates over a read-only memory map of it, so the
+    data set can be larger than RAM. Each iterator maps the items written before it was
+    created; next_batch() returns views into the mapping without copying.
+    """
+
+    def __init__(self, path, typecode="d"):
+        self.path = path
+        self.typecode = typecode
+        self._record = array(typecode)
+        self._file = open(path, "ab")
+
+    def add_item(self, item):
+        self._record.append(item)
+        self._file.write(self._record)
+        self._record.pop()
+
+    def extend(self, items):
+        self._file.write(array(self.typecode, items))
+
+    def __len__(self):
+        self._file.flush()
+        return os.path.getsize(self.path) // self._record.itemsize
+
+    def nbytes(self):
+        return len(self) * self._record.itemsize
+
+    def get_iterator(self):
+        size = len(self) * self._record.itemsize
+        if size == 0:
+            return ListIterator(())
+        with open(self.path, "rb") as file:
+            mapping = mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ)
+        return ListIterator(memoryview(mapping).cast(self.typecode))
+
+    def __iter__(self):
+        return self.get_iterator()
+
+    def close(self):
+        self._file.close()
+
+# Module-level function so that parallel_map() can send it to worker processes
+def square(number):
+    return number * number
+
+# Benchmark: per-item cost of the different ways to walk a ListAggregate
+def benchmark_iteration(size=1_000_000, batch_size=1_024):
+    aggregate = ListAggregate()
+    for number in range(size):
+        aggregate.add_item(number)
+
+    def has_next_loop():
+        iterator = aggregate.get_iterator()
+        while iterator.has_next():
+            iterator.next()
+
+    def for_loop():
+        for _ in aggregate:
+            pass
+
+    def batched():
+        iterator = aggregate.get_iterator()
+        batch = iterator.next_batch(batch_size)
+        while batch:
+            for _ in batch:
+                pass
+            batch = iterator.next_batch(batch_size)
+
+    for name, scan in (("while has_next()/next()", has_next_loop), ("for item in aggregate", for_loop),
+                       (f"next_batch({batch_size})", batched)):
+        start = time.perf_counter()
+        scan()
+        elapsed = time.perf_counter() - start
+        print(f"{name:<24} {elapsed / size * 1e9:>8.1f} ns/item")
+
+# Benchmark: memory use and scan throughput of the aggregate backends
+def benchmark_backends(size=100_000_000, batch_size=65_536, chunk_size=1_000_000):
+    with tempfile.TemporaryDirectory() as directory:
+        list_aggregate = ListAggregate()
+        array_aggregate = ArrayAggregate("d")
+        mmap_aggregate = MmapAggregate(os.path.join(directory, "items.bin"), "d")
+        for start in range(0, size, chunk_size):
+            chunk = [float(number) for number in range(start, min(start + chunk_size, size))]
+            list_aggregate.extend(chunk)
+            array_aggregate.extend(chunk)
+            mmap_aggregate.extend(chunk)
+        del chunk
+
+        # A list holds an 8-byte pointer plus a boxed float object per item
+        list_bytes = sys.getsizeof([]) + size * (8 + sys.getsizeof(0.0))
+        print(f"list:  {list_bytes / 2**20:>10,.0f} MiB in memory")
+        print(f"array: {array_aggregate.nbytes() / 2**20:>10,.0f} MiB in memory")
+        print(f"mmap:  {mmap_aggregate.nbytes() / 2**20:>10,.0f} MiB on disk, paged in on demand")
+
+        def scan(aggregate):
+            total = 0.0
+            iterator = aggregate.get_iterator()
+            batch = iterator.next_batch(batch_size)
+            while batch:
+                total += sum(batch)
+                batch = iterator.next_batch(batch_size)
+            return total
+
+        for name, aggregate in (("list", list_aggregate), ("array", array_aggregate), ("mmap", mmap_aggregate)):
+            start = time.perf_counter()
+            scan(aggregate)
+            elapsed = time.perf_counter() - start
+            print(f"scan {name:<6} {size / elapsed:>14,.0f} items/s")
+        mmap_aggregate.close()
+
+# Stress test: every scan must return exactly the items present when its iterator was created,
+# although writers keep appending during the scan
+def stress_test_snapshots(readers=4, writers=2, items_per_writer=200_000):
+    aggregate = VersionedListAggregate()
+    counter = iter(range(writers * items_per_writer))  # Shared, so items stay ordered
+    counter_lock = threading.Lock()
+    done = threading.Event()
+    failures = []
+    scans = [0] * readers
+    grown = [0] * readers  # Scans during which the aggregate grew
+
+    def write():
+        for _ in range(items_per_writer):
+            with counter_lock:
+                aggregate.add_item(next(counter))
+
+    def read(reader):
+        while not done.is_set():
+            with counter_lock:  # Holds the writers back, so the version matches the iterator
+                version = aggregate.version
+                iterator = aggregate.get_iterator()
+            expected = 0
+            for item in iterator:
+                if item != expected:
+                    failures.append(f"expected item {expected}, got {item}")
+                    return
+                expected += 1
+            if expected != version:
+                failures.append(f"scan of version {version} returned {expected} items")
+                return
+            scans[reader] += 1
+            grown[reader] += aggregate.version > version
+
+    reader_threads = [threading.Thread(target=read, args=(index,)) for index in range(readers)]
+    writer_threads = [threading.Thread(target=write) for _ in range(writers)]
+    for thread in reader_threads + writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    done.set()
+    for thread in reader_threads:
+        thread.join()
+
+    assert not failures, f"Inconsistent snapshot: {failures[0]}"
+    assert list(aggregate) == list(range(writers * items_per_writer))
+    print(f"stress test passed: {sum(scans):,} consistent scans ({sum(grown):,} while items were appended) "
+          f"during {writers * items_per_writer:,} appends")
+
+# Benchmark: snapshot iteration vs. lock-and-copy while another thread appends
+def benchmark_snapshots(size=1_000_000, scans=50, batch_size=1_024):
+    for aggregate in (VersionedListAggregate(), LockedListAggregate()):
+        aggregate.extend(range(size))
+        done = threading.Event()
+
+        def write():
+            number = size
+            while not done.is_set():
+                aggregate.add_item(number)
+                number += 1
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        start = time.perf_counter()
+        for _ in range(scans):
+            iterator = aggregate.get_iterator()
+            while iterator.next_batch(batch_size):
+                pass
+        elapsed = time.perf_counter() - start
+        done.set()
+        writer.join()
+        print(f"{type(aggregate).__name__:<24} {scans / elapsed:>8,.1f} scans/s")
+
 # Client code
 if __name__ == "__main__":
     list_aggregate = ListAggregate()
@@ -62,6 +507,26 @@ if __name__ == "__main__":
     while iterator.has_next():
         print(iterator.next())
 
+    # The same traversal with a for loop and in batches
+    for item in list_aggregate:
+        print(item)
+
+    print(list_aggregate.get_iterator().next_batch(2))  # Output: ['Item 1', 'Item 2']
+
+    # A lazy pipeline over the aggregate
+    numbers = ListAggregate()
+    numbers.extend(range(10))
+    pipeline = numbers.get_iterator().filter(lambda number: number % 2 == 0).map(str).chunk(2)
+    print(list(pipeline))  # Output: [['0', '2'], ['4', '6'], ['8']]
+    print(list(numbers.get_iterator().window(3).take(2)))  # Output: [(0, 1, 2), (1, 2, 3)]
+    print(list(numbers.get_iterator().parallel_map(square, chunk_size=4, workers=2)))
+
+    if "--benchmark" in sys.argv[1:]:
+        benchmark_iteration()
+        benchmark_backends()
+        stress_test_snapshots()
+        benchmark_snapshots()
+
 
 
 """
@@ -70,4 +535,12 @@ In this example, we have an Iterator abstract class that defines the common inte
 The Aggregate abstract class represents the collection, and the ListAggregate is a concrete implementation of the collection using a list.
 
 The client code creates a ListAggregate and adds items to it. It obtains the iterator using get_iterator() and then iterates over the elements using the iterator's has_next() and next() methods.
+
+Iterators also implement Python's iterator protocol, so an aggregate can be used directly in a for loop, which avoids a separate has_next() call for every element. next_batch(n) hands out up to n items at once so that consumers can work on chunks.
+
+For numeric data, ArrayAggregate stores the items unboxed in a typed array and MmapAggregate keeps them in a memory-mapped file, so a data set can exceed the available memory. Both hand the same ListIterator a memoryview, which makes every batch a view into the underlying storage instead of a copy.
+
+Iterators can also be chained into lazy pipelines with map(), filter(), take(), window() and chunk(). Every stage pulls items from the previous one only when asked, so the whole pipeline runs in a single pass and never builds intermediate lists, even over a FileAggregate reading a large file. parallel_map() sends chunks of items to a process pool and still yields the results in order.
+
+A plain ListIterator sees items that are appended while it is running. VersionedListAggregate avoids this without copying: items are only ever appended, so each iterator remembers the length at creation time and stops there, while other threads keep adding items. LockedListAggregate shows the lock-and-copy alternative, which costs O(n) for every iterator.
 """
@@ -4,26 +4,58 @@ Observer design pattern:
 The Observer design pattern is used when you want to establish a one-to-many dependency between objects, where one object (subject) changes its state, and all its dependents (observers) are notified automatically. Here's an example of the Observer pattern in Python:.
 """
 
+import asyncio
+import inspect
+import multiprocessing
+import random
+import statistics
+import struct
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+
 # Subject (Observable) class
 class Subject:
     def __init__(self):
-        self._observers = []
+        self._observers = {}  # Used as an ordered set: O(1) attach and detach, notified in attach order
 
     def attach(self, observer):
-        self._observers.append(observer)
+        # Observers must be hashable; attaching one that is already attached has no effect
+        self._observers[observer] = None
 
     def detach(self, observer):
-        self._observers.remove(observer)
+        if observer not in self._observers:
+            raise ValueError("Observer is not attached")
+        del self._observers[observer]
 
     def notify(self, message):
         for observer in self._observers:
             observer.update(message)
 
+    def notify_batch(self, messages):
+        # Observers that only care about the latest value get just the last message
+        latest = messages[-1:]
+        for observer in self._observers:
+            batch = latest if getattr(observer, "latest_only", False) else messages
+            update_batch = getattr(observer, "update_batch", None)
+            if update_batch is not None:
+                update_batch(batch)
+            else:
+                for message in batch:
+                    observer.update(message)
+
 # Observer (Observer) class
 class Observer:
+    latest_only = False  # True to receive only the newest message of every batch
+
     def update(self, message):
         pass
 
+    def update_batch(self, messages):
+        for message in messages:
+            self.update(message)
+
 # Concrete Subject class
 class NewsAgency(Subject):
     def __init__(self):
@@ -42,6 +74,611 @@ class NewsChannel(Observer):
     def update(self, message):
         print(f"{self._name} received news: {message}")
 
+# Node of the topic trie used by TopicSubject
+class TopicNode:
+    __slots__ = ("children", "observers")
+
+    def __init__(self):
+        self.children = {}
+        self.observers = {}
+
+# Subject with subscriptions to dotted topics
+class TopicSubject(Subject):
+    """
+    Observers subscribe to dotted topic patterns such as "sports.football". In a pattern, "*"
+    matches exactly one segment and "#" matches any number of segments, including none.
+    Patterns are stored in a trie, so notify() only visits the branches matching the topic
+    and calls each matching observer once. Observers attached with attach() receive every
+    message.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._root = TopicNode()
+        self._subscriptions = {}  # Observer -> its patterns, so detach() needs no search
+
+    def subscribe(self, observer, pattern):
+        node = self._root
+        for segment in pattern.split("."):
+            node = node.children.setdefault(segment, TopicNode())
+        node.observers[observer] = None
+        self._subscriptions.setdefault(observer, {})[pattern] = None
+
+    def unsubscribe(self, observer, pattern):
+        path = [self._root]
+        segments = pattern.split(".")
+        for segment in segments:
+            node = path[-1].children.get(segment)
+            if node is None:
+                raise ValueError(f"Observer is not subscribed to {pattern!r}")
+            path.append(node)
+        if observer not in path[-1].observers:
+            raise ValueError(f"Observer is not subscribed to {pattern!r}")
+        del path[-1].observers[observer]
+        patterns = self._subscriptions[observer]
+        del patterns[pattern]
+        if not patterns:
+            del self._subscriptions[observer]
+        # Prune nodes that no longer lead to any observer
+        for parent, node, segment in zip(reversed(path[:-1]), reversed(path[1:]), reversed(segments)):
+            if node.observers or node.children:
+                break
+            del parent.children[segment]
+
+    def detach(self, observer):
+        patterns = self._subscriptions.get(observer)
+        if observer not in self._observers and not patterns:
+            raise ValueError("Observer is not attached")
+        self._observers.pop(observer, None)
+        for pattern in list(patterns or ()):
+            self.unsubscribe(observer, pattern)
+
+    def _match(self, node, segments, index, matched):
+        wildcard = node.children.get("#")
+        if wildcard is not None:
+            for rest in range(index, len(segments) + 1):
+                self._match(wildcard, segments, rest, matched)
+        if index == len(segments):
+            matched.update(node.observers)
+            return
+        for key in (segments[index], "*"):
+            child = node.children.get(key)
+            if child is not None:
+                self._match(child, segments, index + 1, matched)
+
+    def observers_for(self, topic):
+        matched = dict(self._observers)
+        self._match(self._root, topic.split("."), 0, matched)
+        return matched
+
+    def notify(self, message, topic=None):
+        observers = self._observers if topic is None else self.observers_for(topic)
+        for observer in observers:
+            observer.update(message)
+
+# Concrete Subject class publishing news under topics
+class TopicNewsAgency(TopicSubject):
+    def __init__(self):
+        super().__init__()
+        self._latest_news = None
+
+    def set_news(self, news, topic=None):
+        self._latest_news = news
+        self.notify(news, topic)
+
+# Concrete Observer classes counting what they receive
+class CountingObserver(Observer):
+    def __init__(self):
+        self.received = 0
+
+    def update(self, message):
+        self.received += 1
+
+class FilteringObserver(CountingObserver):
+    # Receives every message and ignores the ones outside its topic
+    def __init__(self, topic):
+        super().__init__()
+        self.topic = topic
+
+    def update(self, message):
+        if message[0] == self.topic:
+            self.received += 1
+
+class BatchCountingObserver(CountingObserver):
+    def update_batch(self, messages):
+        self.received += len(messages)
+
+# Concrete Observer class only interested in the latest news
+class LatestNewsBoard(Observer):
+    latest_only = True
+
+    def __init__(self):
+        self.headline = None
+        self.received = 0
+
+    def update(self, message):
+        self.headline = message
+        self.received += 1
+
+# Concrete Subject class delivering news in batches
+class BatchingNewsAgency(NewsAgency):
+    """
+    Buffers published news and delivers it through notify_batch() once `batch_size` messages
+    are pending or the oldest pending message is `max_delay` seconds old. A timer started with
+    the first message of each batch delivers it when publishing pauses, so observers may be
+    called from the timer thread. Leaving the `with` block delivers what is still pending.
+    """
+
+    def __init__(self, batch_size=100, max_delay=0.01):
+        super().__init__()
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._pending = []
+        self._timer = None
+        self._batches = 0  # Number of batches delivered, so a late timer does not cut the next one short
+        # Publishing and the timer both deliver batches; delivering under the lock keeps them in order
+        self._lock = threading.RLock()  # Reentrant, so observers can publish from update()
+
+    def notify(self, message):
+        with self._lock:
+            self._pending.append(message)
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.max_delay, self._expire, (self._batches,))
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _expire(self, batch):
+        with self._lock:
+            if batch == self._batches:
+                self._flush()
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending:
+            messages, self._pending = self._pending, []
+            self._batches += 1
+            self.notify_batch(messages)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+# Single-producer, multi-consumer ring buffer in shared memory
+class SharedRingBuffer:
+    """
+    Fixed-size slots in a multiprocessing.shared_memory segment, preceded by a header with
+    the write sequence number, a closed flag and one read cursor per subscriber. The producer
+    writes each message once and every subscriber process reads it with its own cursor, so
+    nothing is pickled or copied per subscriber. The producer waits instead of overwriting a
+    slot the slowest subscriber has not read yet. Counters are aligned 8-byte fields written
+    by a single process each. Subscribers remove their cursor when they stop reading, and
+    the producer drops the cursors of watched processes that have died, so a crashed
+    subscriber cannot block it forever.
+    """
+
+    HEADER = struct.Struct("<QQQQQ")  # Write sequence, closed flag, capacity, slot size, max subscribers
+    CURSOR = struct.Struct("<Q")
+    LENGTH = struct.Struct("<I")
+    INACTIVE = 2**64 - 1  # Cursor value of an unused subscriber slot
+
+    def __init__(self, shm, owner):
+        self._shm = shm
+        self._owner = owner
+        self._buf = shm.buf
+        _, _, self.capacity, self.slot_size, self.max_subscribers = self.HEADER.unpack_from(self._buf)
+        self._cursors = self.HEADER.size
+        self._slots = self._cursors + self.CURSOR.size * self.max_subscribers
+        self._write_seq = self.HEADER.unpack_from(self._buf)[0]
+        self._min_cursor = self._write_seq
+        self._watched = {}  # Subscriber index -> process reading with that cursor
+
+    @classmethod
+    def create(cls, capacity=4_096, slot_size=256, max_subscribers=16):
+        size = cls.HEADER.size + cls.CURSOR.size * max_subscribers + capacity * slot_size
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        cls.HEADER.pack_into(shm.buf, 0, 0, 0, capacity, slot_size, max_subscribers)
+        for index in range(max_subscribers):
+            cls.CURSOR.pack_into(shm.buf, cls.HEADER.size + cls.CURSOR.size * index, cls.INACTIVE)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def _cursor_offset(self, index):
+        return self._cursors + self.CURSOR.size * index
+
+    def add_subscriber(self):
+        # Called by the producer; the subscriber starts with the next published message
+        for index in range(self.max_subscribers):
+            if self.CURSOR.unpack_from(self._buf, self._cursor_offset(index))[0] == self.INACTIVE:
+                self.CURSOR.pack_into(self._buf, self._cursor_offset(index), self._write_seq)
+                return index
+        raise RuntimeError("All subscriber slots are in use")
+
+    def remove_subscriber(self, index):
+        self.CURSOR.pack_into(self._buf, self._cursor_offset(index), self.INACTIVE)
+
+    def watch(self, index, process):
+        # Called by the producer; the cursor is dropped if the process dies while it is waited on
+        self._watched[index] = process
+
+    def _drop_dead_subscribers(self):
+        for index, process in list(self._watched.items()):
+            if not process.is_alive():
+                del self._watched[index]
+                self.remove_subscriber(index)
+
+    def _slowest_cursor(self):
+        cursors = (self.CURSOR.unpack_from(self._buf, self._cursor_offset(index))[0]
+                   for index in range(self.max_subscribers))
+        return min((cursor for cursor in cursors if cursor != self.INACTIVE), default=self._write_seq)
+
+    def check_size(self, payload):
+        if len(payload) > self.slot_size - self.LENGTH.size:
+            raise ValueError(f"Message of {len(payload)} bytes does not fit in a {self.slot_size} byte slot")
+
+    def publish(self, payload):
+        self.check_size(payload)
+        sequence = self._write_seq
+        # Only re-read the cursors when the cached minimum says the ring may be full
+        while sequence - self._min_cursor >= self.capacity:
+            self._min_cursor = self._slowest_cursor()
+            if sequence - self._min_cursor >= self.capacity:
+                self._drop_dead_subscribers()
+                time.sleep(0.0001)
+        offset = self._slots + (sequence % self.capacity) * self.slot_size
+        self.LENGTH.pack_into(self._buf, offset, len(payload))
+        self._buf[offset + self.LENGTH.size:offset + self.LENGTH.size + len(payload)] = payload
+        self._write_seq = sequence + 1
+        self.CURSOR.pack_into(self._buf, 0, self._write_seq)  # Publish only after the slot is written
+
+    def read(self, index):
+        # Yields messages for one subscriber until the producer closes the ring and it is drained
+        buf = self._buf
+        cursor_offset = self._cursor_offset(index)
+        cursor = self.CURSOR.unpack_from(buf, cursor_offset)[0]
+        while True:
+            write_seq, closed = self.HEADER.unpack_from(buf)[:2]
+            if cursor == write_seq:
+                if closed:
+                    return
+                time.sleep(0.0001)
+                continue
+            while cursor < write_seq:
+                offset = self._slots + (cursor % self.capacity) * self.slot_size
+                length = self.LENGTH.unpack_from(buf, offset)[0]
+                payload = bytes(buf[offset + self.LENGTH.size:offset + self.LENGTH.size + length])
+                cursor += 1
+                self.CURSOR.pack_into(buf, cursor_offset, cursor)
+                yield payload
+
+    def close(self):
+        self.CURSOR.pack_into(self._buf, self.CURSOR.size, 1)  # Second header field: closed flag
+
+    def release(self):
+        self._buf = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+# Entry point of a subscriber process: feeds messages from the ring to a local observer
+def run_ring_subscriber(name, index, observer):
+    ring = SharedRingBuffer.attach(name)
+    try:
+        for payload in ring.read(index):
+            observer.update(payload.decode())
+    finally:
+        ring.remove_subscriber(index)  # Never leave the producer waiting for this cursor
+        ring.release()
+
+# Concrete Subject class that also delivers news to observers in other processes
+class SharedMemoryNewsAgency(NewsAgency):
+    def __init__(self, capacity=4_096, slot_size=256, max_subscribers=16):
+        super().__init__()
+        self.ring = SharedRingBuffer.create(capacity, slot_size, max_subscribers)
+        self._processes = []
+
+    def attach_process(self, observer):
+        # Runs the observer in a new process; it receives news published from now on
+        index = self.ring.add_subscriber()
+        process = multiprocessing.Process(target=run_ring_subscriber, args=(self.ring.name, index, observer))
+        process.start()
+        self.ring.watch(index, process)
+        self._processes.append(process)
+        return process
+
+    def notify(self, message):
+        # Reject oversized news before any observer sees it
+        payload = message.encode()
+        self.ring.check_size(payload)
+        super().notify(message)
+        self.ring.publish(payload)
+
+    def close(self):
+        # Lets subscriber processes drain the remaining news, then frees the shared memory
+        self.ring.close()
+        for process in self._processes:
+            process.join()
+        self._processes.clear()
+        self.ring.release()
+
+# Subscription of one observer to an AsyncSubject: a bounded queue drained by its own worker
+class Subscription:
+    def __init__(self, observer, queue_size, policy, threaded):
+        self.observer = observer
+        self.policy = policy
+        if threaded is None:
+            threaded = not inspect.iscoroutinefunction(observer.update)
+        self.threaded = threaded  # Run a synchronous update() in a thread instead of on the event loop
+        self.queue = asyncio.Queue(queue_size)
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def offer(self, message):
+        queue = self.queue
+        if queue.full():
+            if self.policy == "drop_newest":
+                self.dropped += 1
+                return
+            if self.policy == "drop_oldest":
+                queue.get_nowait()
+                queue.task_done()
+                self.dropped += 1
+        if self.policy == "block":
+            await queue.put(message)
+        else:
+            queue.put_nowait(message)
+        self.max_depth = max(self.max_depth, queue.qsize())
+
+    async def _run(self):
+        update = self.observer.update
+        while True:
+            message = await self.queue.get()
+            try:
+                if self.threaded:
+                    result = await asyncio.to_thread(update, message)
+                else:
+                    result = update(message)
+                if inspect.isawaitable(result):
+                    await result
+                self.delivered += 1
+            except Exception:
+                self.errors += 1
+            finally:
+                self.queue.task_done()
+
+    def stats(self):
+        return {
+            "queued": self.queue.qsize(),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "max_depth": self.max_depth,
+        }
+
+# Subject that delivers to every observer through its own queue
+class AsyncSubject:
+    """
+    Asyncio counterpart of Subject. notify() only enqueues the message for each observer and
+    a worker task per observer calls update(), which may be a coroutine function. When an
+    observer's queue is full, the policy decides what happens: "block" waits for space,
+    "drop_oldest" discards the oldest queued message and "drop_newest" the new one. With the
+    drop policies, notify() never waits for an observer. A synchronous update() runs in a
+    thread so it cannot block the event loop; pass threaded=False for observers that are fast
+    enough to run on the loop. Observers must be attached from a running event loop.
+    """
+
+    POLICIES = ("block", "drop_oldest", "drop_newest")
+
+    def __init__(self, queue_size=1_000, policy="drop_oldest"):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {policy!r}")
+        self.queue_size = queue_size
+        self.policy = policy
+        self._subscriptions = {}
+
+    def attach(self, observer, queue_size=None, policy=None, threaded=None):
+        if policy is not None and policy not in self.POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {policy!r}")
+        self._subscriptions[observer] = Subscription(
+            observer, queue_size or self.queue_size, policy or self.policy, threaded)
+
+    def detach(self, observer):
+        self._subscriptions.pop(observer).worker.cancel()
+
+    async def notify(self, message):
+        for subscription in self._subscriptions.values():
+            await subscription.offer(message)
+
+    def stats(self):
+        return {observer: subscription.stats() for observer, subscription in self._subscriptions.items()}
+
+    def lagging(self, threshold):
+        # Observers with at least `threshold` messages waiting
+        return [observer for observer, subscription in self._subscriptions.items()
+                if subscription.queue.qsize() >= threshold]
+
+    async def close(self, drain=True):
+        subscriptions = list(self._subscriptions.values())
+        if drain:
+            await asyncio.gather(*(subscription.queue.join() for subscription in subscriptions))
+        for subscription in subscriptions:
+            subscription.worker.cancel()
+        await asyncio.gather(*(subscription.worker for subscription in subscriptions), return_exceptions=True)
+        self._subscriptions.clear()
+
+# Concrete Subject class delivering asynchronously
+class AsyncNewsAgency(AsyncSubject):
+    def __init__(self, queue_size=1_000, policy="drop_oldest"):
+        super().__init__(queue_size, policy)
+        self._latest_news = None
+
+    async def set_news(self, news):
+        self._latest_news = news
+        await self.notify(news)
+
+# Concrete Observer classes that take a while to process a message
+class SlowNewsChannel(Observer):
+    def __init__(self, name, delay):
+        self._name = name
+        self._delay = delay
+        self.received = 0
+
+    def update(self, message):
+        time.sleep(self._delay)
+        self.received += 1
+
+class AsyncSlowNewsChannel(SlowNewsChannel):
+    async def update(self, message):
+        await asyncio.sleep(self._delay)
+        self.received += 1
+
+# Entry point of a subscriber process in the queue-based baseline
+def run_queue_subscriber(queue, observer):
+    while (message := queue.get()) is not None:
+        observer.update(message)
+
+# Benchmark: cross-process fan-out through the shared-memory ring vs. one queue per process
+def benchmark_shared_memory(process_counts=(1, 2, 4, 8), messages=100_000):
+    news = [f"Headline number {number}" for number in range(messages)]
+    for count in process_counts:
+        agency = SharedMemoryNewsAgency(max_subscribers=count)
+        for _ in range(count):
+            agency.attach_process(CountingObserver())
+        start = time.perf_counter()
+        for headline in news:
+            agency.set_news(headline)
+        agency.close()
+        ring_rate = messages / (time.perf_counter() - start)
+
+        queues = [multiprocessing.Queue() for _ in range(count)]
+        processes = [multiprocessing.Process(target=run_queue_subscriber, args=(queue, CountingObserver()))
+                     for queue in queues]
+        for process in processes:
+            process.start()
+        start = time.perf_counter()
+        for headline in news:
+            for queue in queues:
+                queue.put(headline)
+        for queue in queues:
+            queue.put(None)
+        for process in processes:
+            process.join()
+        queue_rate = messages / (time.perf_counter() - start)
+        print(f"{count:>2} processes | shared ring: {ring_rate:>10,.0f} messages/s | "
+              f"queue per process: {queue_rate:>10,.0f} messages/s")
+
+# Benchmark: per-message notify vs. batched delivery
+def benchmark_batching(messages=100_000, observers=100, batch_size=256):
+    def run(agency, observer_type):
+        for _ in range(observers):
+            agency.attach(observer_type())
+        start = time.perf_counter()
+        for number in range(messages):
+            agency.set_news(number)
+        if isinstance(agency, BatchingNewsAgency):
+            agency.flush()
+        return messages / (time.perf_counter() - start)
+
+    print(f"per-message notify:           {run(NewsAgency(), CountingObserver):>12,.0f} messages/s")
+    for name, observer_type in (("update_batch()", BatchCountingObserver), ("fallback loop", CountingObserver),
+                                ("latest value only", LatestNewsBoard)):
+        rate = run(BatchingNewsAgency(batch_size=batch_size, max_delay=1.0), observer_type)
+        print(f"batched, {name:<20} {rate:>12,.0f} messages/s")
+
+# Benchmark: broadcasting to 100k observers vs. topic-indexed delivery
+def benchmark_topics(observers=100_000, categories=100, messages=1_000):
+    topics = [f"news.category{index % categories}.region{index}" for index in range(observers)]
+    published = [random.choice(topics) for _ in range(messages)]
+
+    broadcast = Subject()
+    for topic in topics:
+        broadcast.attach(FilteringObserver(topic))
+    start = time.perf_counter()
+    for topic in published[:messages // 100 or 1]:
+        broadcast.notify((topic, "news"))
+    elapsed = (time.perf_counter() - start) / (messages // 100 or 1)
+    print(f"broadcast + filter: {1 / elapsed:>12,.1f} messages/s")
+
+    indexed = TopicSubject()
+    subscribers = [CountingObserver() for _ in topics]
+    start = time.perf_counter()
+    for observer, topic in zip(subscribers, topics):
+        indexed.subscribe(observer, topic)
+    subscribe_time = time.perf_counter() - start
+    for index in range(0, observers, observers // 10 or 1):  # A few wildcard subscribers as well
+        indexed.subscribe(subscribers[index], f"news.category{index % categories}.*")
+    start = time.perf_counter()
+    for topic in published:
+        indexed.notify((topic, "news"), topic)
+    elapsed = (time.perf_counter() - start) / messages
+    print(f"topic index:        {1 / elapsed:>12,.1f} messages/s")
+
+    start = time.perf_counter()
+    for observer in subscribers:
+        indexed.detach(observer)
+    detach_time = time.perf_counter() - start
+    print(f"subscribe {observers:,}: {subscribe_time:.2f} s | detach {observers:,}: {detach_time:.2f} s")
+
+# Benchmark: set_news latency with one slow observer, synchronous vs. asynchronous delivery
+def benchmark_async_delivery(messages=500, fast_observers=10, delay=0.005):
+    def report(name, latencies):
+        latencies = sorted(latencies)
+        print(f"{name:<32} set_news p50 {statistics.median(latencies) * 1e6:>9.1f} us | "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:>9.1f} us")
+
+    agency = NewsAgency()
+    agency.attach(SlowNewsChannel("slow", delay))
+    for index in range(fast_observers):
+        agency.attach(SlowNewsChannel(f"fast {index}", 0))
+    latencies = []
+    for number in range(messages):
+        start = time.perf_counter()
+        agency.set_news(number)
+        latencies.append(time.perf_counter() - start)
+    report("sync notify", latencies)
+
+    async def run(policy, observer_type):
+        agency = AsyncNewsAgency(queue_size=100, policy=policy)
+        slow = observer_type("slow", delay)
+        agency.attach(slow)
+        for index in range(fast_observers):
+            agency.attach(observer_type(f"fast {index}", 0))
+        latencies = []
+        for number in range(messages):
+            start = time.perf_counter()
+            await agency.set_news(number)
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0)  # Let the workers run between publications
+        stats = agency.stats()[slow]
+        kind = "sync" if observer_type is SlowNewsChannel else "async"
+        report(f"async notify, {kind} {policy}", latencies)
+        print(f"{'':<32} slow observer: delivered {stats['delivered']}, dropped {stats['dropped']}, "
+              f"queued {stats['queued']}")
+        await agency.close(drain=False)
+
+    for observer_type in (SlowNewsChannel, AsyncSlowNewsChannel):
+        for policy in AsyncSubject.POLICIES:
+            asyncio.run(run(policy, observer_type))
+
 # Example usage
 if __name__ == "__main__":
     agency = NewsAgency()
@@ -58,6 +695,43 @@ if __name__ == "__main__":
 
     agency.set_news("New AI breakthrough announced!")
 
+    # Asynchronous delivery: each channel gets its own queue and worker
+    async def main():
+        async_agency = AsyncNewsAgency(queue_size=10, policy="drop_oldest")
+        async_agency.attach(channel1)
+        async_agency.attach(channel2)
+        await async_agency.set_news("Observers now receive news asynchronously!")
+        await async_agency.close()
+
+    asyncio.run(main())
+
+    # Topic subscriptions: channels only receive the news they subscribed to
+    topic_agency = TopicNewsAgency()
+    topic_agency.subscribe(channel1, "sports.*")
+    topic_agency.subscribe(channel2, "tech.#")
+    topic_agency.set_news("Local team wins the cup!", "sports.football")  # Only Channel 1
+    topic_agency.set_news("New Python release!", "tech.languages.python")  # Only Channel 2
+
+    # Batched delivery: a news board only keeps the latest of the buffered headlines
+    board = LatestNewsBoard()
+    with BatchingNewsAgency(batch_size=3) as batching_agency:
+        batching_agency.attach(board)
+        for headline in ("Headline 1", "Headline 2", "Headline 3", "Headline 4"):
+            batching_agency.set_news(headline)
+    print(f"News board shows: {board.headline} after {board.received} updates")  # Headline 4 after 2 updates
+
+    # Cross-process delivery: Channel 3 runs in a separate process
+    shared_agency = SharedMemoryNewsAgency()
+    shared_agency.attach_process(NewsChannel("Channel 3"))
+    shared_agency.set_news("News now crosses process boundaries!")
+    shared_agency.close()
+
+    if "--benchmark" in sys.argv[1:]:
+        benchmark_async_delivery()
+        benchmark_topics()
+        benchmark_batching()
+        benchmark_shared_memory()
+
 
 
 
@@ -70,4 +744,12 @@ The Observer class is an abstract class with an update() method. Concrete observ
 When the NewsAgency updates its state by setting the latest news using the set_news() method, it calls the notify() method to inform all its attached observers. Each observer (NewsChannel) receives the news and processes it by printing it in this example.
 
 By using the Observer pattern, the NewsAgency can notify multiple NewsChannel objects without being aware of their specific implementations. This design promotes loose coupling between the NewsAgency and the NewsChannel, making it easy to add or remove observers without affecting the subject's logic.
+
+Because notify() calls every observer in turn, one slow observer delays the subject and all other observers. AsyncNewsAgency decouples them: each observer has a bounded queue and a worker task of its own, and set_news() only puts the message on the queues. Synchronous observers such as NewsChannel are called in a thread, so they do not stall the event loop. When a queue is full, the backpressure policy either makes the publisher wait or drops the oldest or newest message, and stats() and lagging() show which observers fall behind.
+
+Subject keeps its observers in a dict used as an ordered set, so attaching and detaching do not have to search a list. As with a set, an observer is attached at most once: attaching it again does not make it receive every message twice. Observers also have to be hashable, so a class that defines __eq__ must define __hash__ as well. TopicNewsAgency goes further and lets observers subscribe to dotted topics, with "*" and "#" as wildcards. The subscriptions are stored in a trie, so publishing a message only reaches the observers whose patterns match its topic instead of every observer.
+
+At high publish rates the cost of calling update() once per message and observer dominates. BatchingNewsAgency buffers messages until a batch is full or a timer fires and hands the whole batch to each observer's update_batch(); the default implementation in Observer simply loops over update(). Observers that set latest_only only receive the newest message of each batch.
+
+Observers in other processes cannot be called directly. SharedMemoryNewsAgency writes every message once into a ring buffer in shared memory, and each subscriber process reads it with its own cursor and passes it to a local observer. No message is pickled per subscriber, and the publisher waits rather than overwriting news the slowest subscriber has not read yet. A subscriber process that exits or crashes gives up its cursor, so the publisher stops waiting for it.
 """
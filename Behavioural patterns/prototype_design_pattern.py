@@ -11,12 +11,24 @@ The Prototype pattern typically involves two main components:
 """
 
 import copy
+import pickle
+import sys
+import time
+import tracemalloc
+import types
+from array import array
+from collections.abc import MutableMapping, MutableSequence, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
 
 # Prototype Interface
 class Prototype:
     def clone(self):
         pass
 
+    def clone_many(self, n, overrides=None):
+        return CloneBatch(self, n, overrides)
+
 # Concrete Prototype
 class Sheep(Prototype):
     def __init__(self, name, category):
@@ -29,6 +41,420 @@ class Sheep(Prototype):
     def __str__(self):
         return f"{self.name} ({self.category})"
 
+# Compact collection of clones that differ from their prototype in a few fields
+class CloneBatch(Sequence):
+    """
+    Stores n clones as the prototype plus one column per overridden field. A column is a
+    sequence of n values (a list, an array.array, a range, ...) or a function of the clone's
+    index that is evaluated on access and stores nothing. Items are CloneViews created on
+    access; materialize() turns one into a real, independent clone.
+    """
+
+    def __init__(self, prototype, n, overrides=None):
+        self.prototype = prototype
+        self._n = n
+        self._columns = {}
+        for field, column in (overrides or {}).items():
+            if not callable(column) and len(column) != n:
+                raise ValueError(f"Column {field!r} has {len(column)} values, expected {n}")
+            self._columns[field] = column
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [CloneView(self, position) for position in range(self._n)[index]]
+        if index < 0:
+            index += self._n
+        if not 0 <= index < self._n:
+            raise IndexError("CloneBatch index out of range")
+        return CloneView(self, index)
+
+    def value(self, index, field):
+        column = self._columns.get(field)
+        if column is None:
+            return getattr(self.prototype, field)
+        return column(index) if callable(column) else column[index]
+
+    def column(self, field):
+        # All values of one field, without creating views
+        column = self._columns.get(field)
+        if column is None:
+            return [getattr(self.prototype, field)] * self._n
+        if callable(column):
+            return [column(index) for index in range(self._n)]
+        return column
+
+    def materialize(self, index):
+        clone = self.prototype.clone()
+        for field in self._columns:
+            setattr(clone, field, self.value(index, field))
+        return clone
+
+# Read-only view of one clone in a CloneBatch
+class CloneView:
+    __slots__ = ("_batch", "_index")
+
+    def __init__(self, batch, index):
+        object.__setattr__(self, "_batch", batch)
+        object.__setattr__(self, "_index", index)
+
+    def __getattr__(self, name):
+        prototype_type = type(self._batch.prototype)
+        attribute = getattr(prototype_type, name, None)
+        if isinstance(attribute, types.FunctionType):
+            return types.MethodType(attribute, self)  # Methods see the view's field values
+        return self._batch.value(self._index, name)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CloneView is read-only, use CloneBatch.materialize() to get a mutable clone")
+
+    def __str__(self):
+        return type(self._batch.prototype).__str__(self)
+
+# Large binary data that pickle protocol 5 can transfer out-of-band
+class Payload:
+    def __init__(self, data):
+        self.data = memoryview(data)
+
+    def __reduce_ex__(self, protocol):
+        if protocol >= 5:
+            return type(self), (pickle.PickleBuffer(self.data),)
+        return type(self), (bytes(self.data),)
+
+    def __len__(self):
+        return self.data.nbytes
+
+# Concrete Prototype carrying a large payload
+class GenomeSheep(Sheep):
+    def __init__(self, name, category, genome):
+        super().__init__(name, category)
+        self.genome = Payload(genome)
+
+# Registry of prototypes that can be cloned cheaply in other processes
+class PrototypeRegistry:
+    """
+    Pickles each registered prototype once with protocol 5. Large buffers (such as Payload
+    data) are taken out of the pickle and copied once into shared memory. reference() returns
+    a small, picklable PrototypeReference that worker processes use to clone the prototype:
+    only the pickle is sent and the buffers are mapped, so the bulk data is never copied
+    again. Buffers are mapped read-only, so clones share them and cannot change them.
+
+    Worker processes have to share this process's resource tracker, or they unlink the
+    segments when they exit. The tracker is started here, so create the registry before
+    forking a process pool.
+
+    clone() copies the buffers, so local clones are independent of the registry. Clones made
+    through a reference point into the shared segments and must not outlive the registry:
+    unregister() and close() unlink the segments.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        resource_tracker.ensure_running()
+
+    def register(self, name, prototype):
+        if name in self._entries:
+            self.unregister(name)
+        buffers = []
+        data = pickle.dumps(prototype, protocol=5, buffer_callback=buffers.append)
+        segments = []
+        for buffer in buffers:
+            raw = buffer.raw()
+            segment = shared_memory.SharedMemory(create=True, size=max(raw.nbytes, 1))
+            segment.buf[:raw.nbytes] = raw
+            segments.append((segment, raw.nbytes))
+        self._entries[name] = (data, segments)
+
+    def unregister(self, name):
+        _, segments = self._entries.pop(name)
+        for segment, _ in segments:
+            segment.unlink()  # First, so the name is removed even while clones still use the buffer
+            try:
+                segment.close()
+            except BufferError:
+                pass  # Something still references the buffer; the mapping goes away with the segment object
+
+    def reference(self, name):
+        data, segments = self._entries[name]
+        return PrototypeReference(name, data, [(segment.name, size) for segment, size in segments])
+
+    def clone(self, name):
+        # Copies the buffers: a clone pointing into segment.buf would keep close() from working
+        data, segments = self._entries[name]
+        return pickle.loads(data, buffers=[bytes(segment.buf[:size]) for segment, size in segments])
+
+    def close(self):
+        for name in list(self._entries):
+            self.unregister(name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+# Shared memory segments a process has attached to: only the latest version of each prototype
+# stays attached, older versions are closed once no clone in this process uses them anymore
+_attached_segments = {}  # Prototype name -> {shared memory name: segment}
+_stale_segments = []
+
+def _close_stale_segments():
+    for segment in list(_stale_segments):
+        try:
+            segment.close()
+        except BufferError:
+            continue  # A clone still points into it, try again on the next clone
+        _stale_segments.remove(segment)
+
+class PrototypeReference:
+    def __init__(self, name, data, segments):
+        self.name = name
+        self.data = data
+        self.segments = segments  # (shared memory name, size) per out-of-band buffer
+
+    def clone(self):
+        attached = _attached_segments.get(self.name)
+        if attached is None or attached.keys() != {name for name, _ in self.segments}:
+            if attached is not None:
+                _stale_segments.extend(attached.values())  # The prototype was registered again
+            attached = _attached_segments[self.name] = {
+                name: shared_memory.SharedMemory(name=name) for name, _ in self.segments}
+        if _stale_segments:
+            _close_stale_segments()
+        buffers = [attached[name].buf[:size].toreadonly() for name, size in self.segments]
+        return pickle.loads(self.data, buffers=buffers)
+
+# Worker functions for the cross-process cloning benchmark
+def clone_naively(prototype):
+    return len(prototype.clone().genome)
+
+def clone_by_reference(reference):
+    return len(reference.clone().clone().genome)
+
+# Copy-on-write views over nested configuration
+class CopyOnWriteContainer:
+    """
+    Wraps a dict or list that may be shared with clones. Reading hands out child views for
+    nested dicts and lists; the first write to a view copies just that level (a shallow copy)
+    and its parents up to the prototype, so everything that is not written stays shared.
+    """
+
+    def __init__(self, data, parent=None, key=None):
+        self._data = data
+        self._parent = parent
+        self._key = key
+        self._owned = False  # True once _data is a private copy
+        self._children = {}
+
+    def _wrap(self, key, value):
+        if isinstance(value, (dict, list)):
+            child = self._children.get(key)
+            if child is None or child._data is not value:
+                child = self._children[key] = _copy_on_write(value, self, key)
+            return child
+        return value
+
+    def _own(self):
+        if not self._owned:
+            self._data = self._data.copy()
+            self._owned = True
+            if self._parent is not None:
+                self._parent._own()
+                self._parent._data[self._key] = self._data
+
+    def _share(self):
+        # Called when a clone starts sharing the data: the next write has to copy again
+        self._owned = False
+        for child in self._children.values():
+            child._share()
+
+    def _detach_children(self):
+        for child in self._children.values():
+            child._parent = None
+        self._children.clear()
+
+    def fork(self):
+        self._share()
+        return type(self)(self._data)
+
+    def materialize(self):
+        # Independent plain copy of the data, e.g. for serialization
+        return copy.deepcopy(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __eq__(self, other):
+        if isinstance(other, CopyOnWriteContainer):
+            other = other._data
+        return self._data == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._data!r})"
+
+class CopyOnWriteDict(CopyOnWriteContainer, MutableMapping):
+    def __getitem__(self, key):
+        return self._wrap(key, self._data[key])
+
+    def __setitem__(self, key, value):
+        self._own()
+        child = self._children.pop(key, None)
+        if child is not None:
+            child._parent = None
+        self._data[key] = _unwrap(value)
+
+    def __delitem__(self, key):
+        self._own()
+        child = self._children.pop(key, None)
+        if child is not None:
+            child._parent = None
+        del self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+class CopyOnWriteList(CopyOnWriteContainer, MutableSequence):
+    # Views taken from the list before an insert or delete are detached from it afterwards
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(len(self._data))[index]]
+        if index < 0:
+            index += len(self._data)
+        return self._wrap(index, self._data[index])
+
+    def __setitem__(self, index, value):
+        self._own()
+        if isinstance(index, slice):
+            self._detach_children()
+            self._data[index] = value
+            return
+        if index < 0:
+            index += len(self._data)
+        child = self._children.pop(index, None)
+        if child is not None:
+            child._parent = None
+        self._data[index] = _unwrap(value)
+
+    def __delitem__(self, index):
+        self._own()
+        self._detach_children()
+        del self._data[index]
+
+    def insert(self, index, value):
+        self._own()
+        self._detach_children()
+        self._data.insert(index, _unwrap(value))
+
+def _unwrap(value):
+    # A view's data becomes shared when stored elsewhere, so its owner copies before writing again
+    if isinstance(value, CopyOnWriteContainer):
+        value._share()
+        return value._data
+    return value
+
+def _copy_on_write(data, parent=None, key=None):
+    if isinstance(data, dict):
+        return CopyOnWriteDict(data, parent, key)
+    return CopyOnWriteList(data, parent, key)
+
+# Prototype whose clones share nested state until it is written
+class CopyOnWritePrototype(Prototype):
+    def __setattr__(self, name, value):
+        if isinstance(value, (dict, list)):
+            value = _copy_on_write(value)
+        super().__setattr__(name, value)
+
+    def clone(self):
+        clone = copy.copy(self)
+        for name, value in vars(self).items():
+            if isinstance(value, CopyOnWriteContainer):
+                object.__setattr__(clone, name, value.fork())
+        return clone
+
+# Concrete Prototype carrying nested configuration
+class ConfiguredSheep(CopyOnWritePrototype):
+    def __init__(self, name, category, config):
+        self.name = name
+        self.category = category
+        self.config = config
+
+    def __str__(self):
+        return f"{self.name} ({self.category})"
+
+# Benchmark: clone + mutate one nested value, copy-on-write vs. deepcopy
+def benchmark_copy_on_write(sizes=(10, 100, 1_000, 10_000), clones=1_000):
+    for size in sizes:
+        config = {f"section{index}": {"enabled": True, "values": list(range(10))} for index in range(size)}
+        plain = Sheep("Dolly", "Merino")
+        plain.config = config
+        cow = ConfiguredSheep("Dolly", "Merino", config)
+
+        start = time.perf_counter()
+        for number in range(clones):
+            clone = copy.deepcopy(plain)
+            clone.config["section0"]["values"][0] = number
+        deep = (time.perf_counter() - start) / clones
+
+        start = time.perf_counter()
+        for number in range(clones):
+            clone = cow.clone()
+            clone.config["section0"]["values"][0] = number
+        shared = (time.perf_counter() - start) / clones
+
+        print(f"{size:>6} sections | deepcopy: {deep * 1e6:>10.1f} us | copy-on-write: {shared * 1e6:>8.1f} us")
+
+# Benchmark: memory and construction time of individual clones vs. clone_many()
+def benchmark_clone_many(sizes=(1_000_000, 10_000_000)):
+    def measure(build):
+        start = time.perf_counter()
+        result = build()
+        elapsed = time.perf_counter() - start
+        del result
+        tracemalloc.start()
+        result = build()
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return elapsed, memory
+
+    prototype = Sheep("Dolly", "Merino")
+    for n in sizes:
+        def individual():
+            clones = []
+            for index in range(n):
+                clone = prototype.clone()
+                clone.weight = float(index % 100)
+                clones.append(clone)
+            return clones
+
+        def batch():
+            weights = array("d", (float(index % 100) for index in range(n)))
+            return prototype.clone_many(n, overrides={"name": lambda index: f"Dolly #{index}", "weight": weights})
+
+        for name, build in (("clone()", individual), ("clone_many()", batch)):
+            elapsed, memory = measure(build)
+            print(f"{n:>11,} x {name:<13} {elapsed:>7.2f} s | {memory / 2**20:>10,.1f} MiB")
+
+# Benchmark: cloning into a process pool by naive pickling vs. through the registry
+def benchmark_registry(payload_mb=64, clones=200, workers=4):
+    prototype = GenomeSheep("Dolly", "Merino", bytes(payload_mb * 2**20))
+    with PrototypeRegistry() as registry, ProcessPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(abs, range(workers)))  # Start the workers before timing
+        start = time.perf_counter()
+        list(pool.map(clone_naively, [prototype] * clones))
+        naive = time.perf_counter() - start
+
+        start = time.perf_counter()
+        registry.register("dolly", prototype)
+        reference = registry.reference("dolly")
+        list(pool.map(clone_by_reference, [reference] * clones))
+        registered = time.perf_counter() - start
+    print(f"{clones} clones of a {payload_mb} MiB prototype | naive pickling: {clones / naive:>8,.1f} clones/s | "
+          f"registry: {clones / registered:>8,.1f} clones/s")
+
 # Client Code
 if __name__ == "__main__":
     original_sheep = Sheep("Dolly", "Merino")
@@ -39,6 +465,27 @@ if __name__ == "__main__":
     cloned_sheep.name = "Lily"
     print("Cloned Sheep:", cloned_sheep)
 
+    # Copy-on-write cloning: nested configuration is shared until a clone changes it
+    configured_sheep = ConfiguredSheep("Dolly", "Merino", {"wool": {"color": "white", "length_cm": 8}})
+    configured_clone = configured_sheep.clone()
+    configured_clone.config["wool"]["color"] = "black"
+    print("Original wool:", configured_sheep.config["wool"]["color"])  # Output: white
+    print("Cloned wool:", configured_clone.config["wool"]["color"])    # Output: black
+
+    # Many clones at once, differing only in their name
+    flock = original_sheep.clone_many(3, overrides={"name": ["Molly", "Polly", "Holly"]})
+    print("Flock:", ", ".join(str(sheep) for sheep in flock))  # Output: Molly (Merino), Polly (Merino), Holly (Merino)
+
+    # Registry: clone a registered prototype by name
+    with PrototypeRegistry() as registry:
+        registry.register("dolly", GenomeSheep("Dolly", "Merino", b"ACGT" * 1024))
+        print("From registry:", registry.clone("dolly"))  # Output: Dolly (Merino)
+
+    if "--benchmark" in sys.argv[1:]:
+        benchmark_copy_on_write()
+        benchmark_clone_many()
+        benchmark_registry()
+
 
 
 
@@ -47,5 +494,11 @@ In this example, we have a Prototype interface that declares a clone() method. T
 
 The copy.copy() function is used for shallow copying in Python, which creates a new object with a new reference but does not create new copies of the object's attributes. If you need a deep copy (i.e., new copies of the attributes as well), you can use copy.deepcopy().
 
+For prototypes with large nested configuration, deepcopy() copies everything even if a clone changes a single value. CopyOnWritePrototype wraps nested dicts and lists in copy-on-write views instead: a clone shares them with its prototype, and the first change to a nested value copies only the levels on the path to it.
+
+When millions of clones differ from the prototype in only a few fields, separate objects waste memory on identical attributes. clone_many() returns a CloneBatch that keeps the prototype once plus a column per overridden field, and creates lightweight views of individual clones only when they are accessed.
+
+PrototypeRegistry keeps prototypes by name and prepares them for cloning in other processes: each prototype is pickled once with protocol 5, and large buffers are placed in shared memory instead of in the pickle. A worker receives only a small reference and maps the buffers, so the bulk data is not copied for every clone.
+
 The Prototype design pattern is beneficial when there is a need for creating objects with similar properties, and it can help reduce the overhead of object creation. Additionally, it provides a level of abstraction, making the client code independent of the concrete classes used for cloning objects.
 """
@@ -6,27 +6,126 @@ The State design pattern is a behavioral pattern that allows an object to change
 Let's create an example of the State pattern for a simple audio player that can be in different playback states: "Playing," "Paused," and "Stopped." We'll use the State pattern to change the behavior of the audio player based on its current state.
 """
 
+import os
+import random
+import sys
+import time
+import weakref
 from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import Counter
+from contextlib import redirect_stdout
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, AudioPlayerFleet falls back to bytearrays without it
+    np = None
 
 # Context class - AudioPlayer
 class AudioPlayer:
+    tracer = None  # StateTracer recording the transitions of all players, None while tracing is off
+
     def __init__(self):
         self._state = StoppedState()
 
     def change_state(self, state):
         self._state = state
 
+    def _handle(self, event):
+        # The state's handler performs the action, its transitions decide the next state
+        state = self._state
+        getattr(state, event)()
+        next_state = state.next_state(event)
+        if self.tracer is not None:
+            self.tracer.record(self, event, state, next_state)
+        if next_state is not state:
+            self.change_state(next_state)
+
     def play(self):
-        self._state.play()
+        self._handle("play")
 
     def pause(self):
-        self._state.pause()
+        self._handle("pause")
 
     def stop(self):
-        self._state.stop()
+        self._handle("stop")
+
+# Instrumentation of state transitions
+class StateTracer:
+    """
+    Counts transitions per (from state, to state, event) and keeps a histogram of how long
+    players stayed in a state before leaving it, measured with a monotonic clock. Time in
+    state is only known for states entered while tracing was on. Bucket bounds are in
+    seconds; the last bucket counts everything above the largest bound.
+    """
+
+    def __init__(self, buckets=(0.001, 0.01, 0.1, 1.0, 10.0, 60.0)):
+        self.buckets = tuple(buckets)
+        self.transitions = Counter()
+        self._histograms = {}
+        self._entered = weakref.WeakKeyDictionary()  # Player -> time it entered its current state
+
+    def record(self, player, event, from_state, to_state):
+        from_name, to_name = type(from_state).__name__, type(to_state).__name__
+        self.transitions[from_name, to_name, event] += 1
+        if to_state is from_state:
+            return
+        now = time.monotonic()
+        entered = self._entered.get(player)
+        self._entered[player] = now
+        if entered is not None:
+            histogram = self._histograms.get(from_name)
+            if histogram is None:
+                histogram = self._histograms[from_name] = {"counts": [0] * (len(self.buckets) + 1), "total": 0.0}
+            elapsed = now - entered
+            histogram["counts"][bisect_left(self.buckets, elapsed)] += 1
+            histogram["total"] += elapsed
+
+    def snapshot(self):
+        return {
+            "transitions": [
+                {"from": from_name, "to": to_name, "event": event, "count": count}
+                for (from_name, to_name, event), count in self.transitions.items()
+            ],
+            "time_in_state": {
+                state: {
+                    "buckets": list(self.buckets),
+                    "counts": list(histogram["counts"]),
+                    "total_seconds": histogram["total"],
+                }
+                for state, histogram in self._histograms.items()
+            },
+        }
+
+def enable_tracing(tracer=None):
+    AudioPlayer.tracer = tracer if tracer is not None else StateTracer()
+    return AudioPlayer.tracer
+
+def disable_tracing():
+    AudioPlayer.tracer = None
 
 # State interface
 class State(ABC):
+    _instances = {}
+    _classes = {}
+    transitions = {}  # Event -> name of the next state class, for the events that leave the state
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        State._classes[cls.__name__] = cls
+
+    def __new__(cls):
+        # States hold no data, so every state class has a single shared (flyweight) instance
+        instance = State._instances.get(cls)
+        if instance is None:
+            instance = State._instances[cls] = super().__new__(cls)
+        return instance
+
+    def next_state(self, event):
+        # The (flyweight) state after `event`; events that do not leave the state return self
+        name = self.transitions.get(event)
+        return self if name is None else State._classes[name]()
+
     @abstractmethod
     def play(self):
         pass
@@ -41,35 +140,36 @@ class State(ABC):
 
 # Concrete State - PlayingState
 class PlayingState(State):
+    transitions = {"pause": "PausedState", "stop": "StoppedState"}
+
     def play(self):
         print("Already playing.")
 
     def pause(self):
         print("Pausing...")
-        return PausedState()
 
     def stop(self):
         print("Stopping...")
-        return StoppedState()
 
 # Concrete State - PausedState
 class PausedState(State):
+    transitions = {"play": "PlayingState", "stop": "StoppedState"}
+
     def play(self):
         print("Resuming playback...")
-        return PlayingState()
 
     def pause(self):
         print("Already paused.")
 
     def stop(self):
         print("Stopping...")
-        return StoppedState()
 
 # Concrete State - StoppedState
 class StoppedState(State):
+    transitions = {"play": "PlayingState"}
+
     def play(self):
         print("Starting playback...")
-        return PlayingState()
 
     def pause(self):
         print("Playback has not started yet.")
@@ -77,8 +177,194 @@ class StoppedState(State):
     def stop(self):
         print("Already stopped.")
 
+EVENTS = ("play", "pause", "stop")
+
+# Helper function compiling state classes into a transition table
+def compile_state_table(state_classes, events=EVENTS, quiet=False):
+    """
+    Maps each flyweight state to a row {event: (next state, action, next state's row)}. The
+    next state comes from next_state(), the same transitions AudioPlayer follows, so no
+    handler runs while compiling. The action is the state's bound handler; it is None when
+    quiet is set, for simulations that only need the transitions.
+    """
+    states = [state_class() for state_class in state_classes]
+    table = {state: {} for state in states}
+    for state in states:
+        for event in events:
+            next_state = state.next_state(event)
+            if next_state not in table:
+                raise ValueError(f"{type(state).__name__}.{event} leads to unknown state {type(next_state).__name__}")
+            action = None if quiet else getattr(state, event)
+            table[state][event] = (next_state, action, table[next_state])
+    return table
+
+# Table-driven state machine engine
+class StateMachine:
+    def __init__(self, table, initial):
+        self._table = table
+        self.state = initial
+        self._row = table[initial]
+
+    def fire(self, event):
+        self.state, action, self._row = self._row[event]
+        if action is not None:
+            action()
+
+# Context class - AudioPlayer driven by a compiled transition table
+class TableDrivenAudioPlayer:
+    _table = None
+
+    def __init__(self, table=None):
+        if table is None:
+            if TableDrivenAudioPlayer._table is None:
+                TableDrivenAudioPlayer._table = compile_state_table((StoppedState, PlayingState, PausedState))
+            table = TableDrivenAudioPlayer._table
+        self._machine = StateMachine(table, StoppedState())
+
+    @property
+    def state(self):
+        return self._machine.state
+
+    def play(self):
+        self._machine.fire("play")
+
+    def pause(self):
+        self._machine.fire("pause")
+
+    def stop(self):
+        self._machine.fire("stop")
+
+# Batch of audio players simulated together
+class AudioPlayerFleet:
+    """
+    Keeps the state of n players as one small integer each (an index into STATE_CLASSES)
+    and applies events with table lookups over the whole array instead of method calls.
+    Events are indices into EVENTS. Uses NumPy when available; without it, broadcast()
+    still runs in C through bytearray.translate(), but step() loops in Python.
+    """
+
+    STATE_CLASSES = (StoppedState, PlayingState, PausedState)
+
+    def __init__(self, n):
+        states = [state_class() for state_class in self.STATE_CLASSES]
+        table = compile_state_table(self.STATE_CLASSES, quiet=True)
+        self._next = [[states.index(table[state][event][0]) for event in EVENTS] for state in states]
+        if np is not None:
+            self.states = np.zeros(n, dtype=np.uint8)
+            self._table = np.array(self._next, dtype=np.uint8)
+        else:
+            self.states = bytearray(n)
+            self._flat = [next_state for row in self._next for next_state in row]
+
+    def broadcast(self, events):
+        # The same events for every player: compose them into one mapping, then apply it once
+        mapping = list(range(len(self._next)))
+        for event in events:
+            mapping = [self._next[state][event] for state in mapping]
+        if np is not None:
+            self.states = np.array(mapping, dtype=np.uint8)[self.states]
+        else:
+            self.states = self.states.translate(bytes(mapping) + bytes(256 - len(mapping)))
+
+    def step(self, events):
+        # One event per player
+        if np is not None:
+            self.states = self._table[self.states, np.asarray(events, dtype=np.uint8)]
+        else:
+            flat, width = self._flat, len(EVENTS)
+            self.states = bytearray(flat[state * width + event] for state, event in zip(self.states, events))
+
+    def apply(self, event_rows):
+        for events in event_rows:
+            self.step(events)
+
+    def counts(self):
+        if np is not None:
+            counts = np.bincount(self.states, minlength=len(self.STATE_CLASSES)).tolist()
+        else:
+            counts = [self.states.count(index) for index in range(len(self.STATE_CLASSES))]
+        return {state_class.__name__: count for state_class, count in zip(self.STATE_CLASSES, counts)}
+
+# Benchmark: transitions/sec of method-based states vs. the compiled table
+def benchmark_transitions(transitions=1_000_000):
+    events = [EVENTS[index % 7 % 3] for index in range(transitions)]
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        players = (("AudioPlayer", AudioPlayer()), ("TableDrivenAudioPlayer", TableDrivenAudioPlayer()))
+        results = []
+        for name, player in players:
+            start = time.perf_counter()
+            for event in events:
+                getattr(player, event)()
+            results.append((name, time.perf_counter() - start))
+
+        machine = StateMachine(compile_state_table((StoppedState, PlayingState, PausedState), quiet=True),
+                               StoppedState())
+        fire = machine.fire
+        start = time.perf_counter()
+        for event in events:
+            fire(event)
+        results.append(("StateMachine, quiet", time.perf_counter() - start))
+    for name, elapsed in results:
+        print(f"{name:<24} {transitions / elapsed:>14,.0f} transitions/s")
+
+# Benchmark: AudioPlayer transitions with tracing off and on
+def benchmark_tracing(transitions=1_000_000):
+    events = [EVENTS[index % 7 % 3] for index in range(transitions)]
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        results = []
+        for name, tracer in (("tracing off", None), ("tracing on", StateTracer())):
+            if tracer is None:
+                disable_tracing()
+            else:
+                enable_tracing(tracer)
+            player = AudioPlayer()
+            start = time.perf_counter()
+            for event in events:
+                getattr(player, event)()
+            results.append((name, time.perf_counter() - start))
+        disable_tracing()
+    for name, elapsed in results:
+        print(f"{name:<12} {elapsed / transitions * 1e9:>8.1f} ns/transition")
+
+# Benchmark: vectorized fleet vs. one AudioPlayer object per player
+def benchmark_fleet(players=10_000_000, events=100, sample_players=10_000, distinct_rows=10):
+    rng = random.Random(42)
+    sample_rows = [[rng.randrange(len(EVENTS)) for _ in range(sample_players)] for _ in range(events)]
+    objects = [AudioPlayer() for _ in range(sample_players)]
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        start = time.perf_counter()
+        for row in sample_rows:
+            for player, event in zip(objects, row):
+                getattr(player, EVENTS[event])()
+        elapsed = time.perf_counter() - start
+    per_transition = elapsed / (sample_players * events)
+    print(f"object per player: {1 / per_transition:>14,.0f} transitions/s "
+          f"(~{per_transition * players * events:,.0f} s estimated for {players:,} x {events})")
+
+    if np is None:
+        print("NumPy is not installed, skipping the per-player vectorized run")
+    else:
+        generator = np.random.default_rng(42)
+        rows = [generator.integers(0, len(EVENTS), players, dtype=np.uint8) for _ in range(distinct_rows)]
+        fleet = AudioPlayerFleet(players)
+        start = time.perf_counter()
+        for step in range(events):
+            fleet.step(rows[step % distinct_rows])
+        elapsed = time.perf_counter() - start
+        print(f"fleet.step():      {players * events / elapsed:>14,.0f} transitions/s "
+              f"({elapsed:.1f} s for {players:,} x {events}) -> {fleet.counts()}")
+
+    fleet = AudioPlayerFleet(players)
+    broadcast_events = [rng.randrange(len(EVENTS)) for _ in range(events)]
+    start = time.perf_counter()
+    fleet.broadcast(broadcast_events)
+    elapsed = time.perf_counter() - start
+    print(f"fleet.broadcast(): {players * events / elapsed:>14,.0f} transitions/s "
+          f"({elapsed:.2f} s for {players:,} x {events}) -> {fleet.counts()}")
+
 # Client code
 if __name__ == "__main__":
+    tracer = enable_tracing()
     player = AudioPlayer()
 
     player.play() # Output: Starting playback...
@@ -87,6 +373,28 @@ if __name__ == "__main__":
     player.stop() # Output: Stopping...
     player.pause() # Output: Playback has not started yet.
 
+    disable_tracing()
+    print(tracer.snapshot()["transitions"][0])  # Output: {'from': 'StoppedState', 'to': 'PlayingState', 'event': 'play', 'count': 1}
+
+    # The same sequence through the compiled transition table
+    table_player = TableDrivenAudioPlayer()
+    table_player.play()
+    table_player.pause()
+    table_player.play()
+    table_player.stop()
+    table_player.pause()
+
+    # A fleet of players simulated with array operations
+    fleet = AudioPlayerFleet(4)
+    fleet.step([0, 0, 0, 2])  # Three players start playing, the fourth stays stopped
+    fleet.step([1, 2, 0, 0])  # Pause one, stop one, start the fourth
+    print(fleet.counts())  # Output: {'StoppedState': 1, 'PlayingState': 2, 'PausedState': 1}
+
+    if "--benchmark" in sys.argv[1:]:
+        benchmark_transitions()
+        benchmark_fleet()
+        benchmark_tracing()
+
 
 
 
@@ -99,4 +407,10 @@ The State interface defines the common interface for all states, with methods to
 The concrete state classes (PlayingState, PausedState, and StoppedState) implement the State interface with specific behavior for each state.
 
 When the client code calls methods like play(), pause(), or stop() on the audio player, the behavior of the player changes based on its current state, as determined by the current concrete state.
+
+Each state method performs the action for an event, and the state's transitions name the state that follows it (events that are not listed keep the current state); the audio player switches to it with change_state(). The states hold no data, so State hands out one shared flyweight instance per class instead of allocating a new object on every transition. TableDrivenAudioPlayer goes one step further: compile_state_table() builds a table from the transitions each state class declares, so a transition becomes a single dict lookup followed by a call to the state's handler.
+
+AudioPlayerFleet applies the same table to many players at once: the state of every player is a small integer in an array, and an event stream is applied with one array lookup per step rather than one method call per player.
+
+To see how players move between states, enable_tracing() installs a StateTracer that counts transitions per (from, to, event) and records how long players stayed in each state. snapshot() exports the data as a plain dict. While tracing is off, the only cost is one attribute check per event.
 """
@@ -7,7 +7,20 @@ Let's see a simple example of the Strategy design pattern in Python. We'll imple
 """
 
 
+import asyncio
+import random
+import statistics
+import sys
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections import deque
+from decimal import Decimal
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, price_carts() falls back to plain Python without it
+    np = None
 
 # Abstract PaymentStrategy class (Strategy interface)
 class PaymentStrategy(ABC):
@@ -15,6 +28,14 @@ class PaymentStrategy(ABC):
     def pay(self, amount):
         pass
 
+    def pay_batch(self, amounts):
+        for amount in amounts:
+            self.pay(amount)
+
+    async def pay_async(self, amount):
+        # Runs the synchronous pay() in a thread so that it does not block the event loop
+        await asyncio.to_thread(self.pay, amount)
+
 # Concrete strategy class for Credit Card payment
 class CreditCardPayment(PaymentStrategy):
     def __init__(self, card_number, expiration_date, cvv):
@@ -25,6 +46,10 @@ class CreditCardPayment(PaymentStrategy):
     def pay(self, amount):
         print(f"Paying ${amount} with Credit Card: {self.card_number}")
 
+    def gateway_request(self, amount):
+        # One line in the payment gateway's protocol, see PooledCheckoutRunner
+        return f"PAY card {self.card_number.replace(' ', '')} {amount}\n".encode()
+
 # Concrete strategy class for PayPal payment
 class PayPalPayment(PaymentStrategy):
     def __init__(self, email, password):
@@ -34,29 +59,565 @@ class PayPalPayment(PaymentStrategy):
     def pay(self, amount):
         print(f"Paying ${amount} with PayPal: {self.email}")
 
+    def gateway_request(self, amount):
+        return f"PAY paypal {self.email} {amount}\n".encode()
+
+# Rolling window of recent latencies
+class LatencyTracker:
+    def __init__(self, window=200):
+        self._samples = deque(maxlen=window)
+
+    def record(self, seconds):
+        self._samples.append(seconds)
+
+    def percentile(self, fraction):
+        # None until there is at least one sample
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+# Circuit breaker taking a failing strategy out of rotation
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures. While open, requests are refused
+    until `reset_timeout` seconds have passed; then one trial request is let through
+    (half-open) and closes the breaker again if it succeeds. allow() returns a ticket, or None
+    to refuse the request, and the outcome is reported with that ticket. The first allow() in
+    half-open claims the trial and everyone else is refused until the trial's ticket reports
+    its outcome or is abandoned because the request never ran to completion; reports with
+    other tickets leave the trial alone.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=5.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = None  # Ticket of the half-open trial request while it is in flight
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def available(self):
+        # Whether allow() would let a request through, without claiming the trial
+        state = self.state
+        return state == "closed" or (state == "half-open" and self._trial is None)
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "open" or (state == "half-open" and self._trial is not None):
+                return None
+            ticket = object()
+            if state == "half-open":
+                self._trial = ticket
+            return ticket
+
+    def abandon(self, ticket):
+        # The request was allowed but cancelled before it had an outcome
+        with self._lock:
+            if ticket is self._trial:
+                self._trial = None
+
+    def record_success(self, ticket):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            if ticket is self._trial:
+                self._trial = None
+
+    def record_failure(self, ticket):
+        with self._lock:
+            self.failures += 1
+            trial = ticket is self._trial
+            if trial:
+                self._trial = None
+            if trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+# Strategy routing each payment to the fastest healthy strategy
+class RouterPayment(PaymentStrategy):
+    """
+    Wraps several payment strategies and tracks a rolling latency window and a circuit
+    breaker for each. Payments go to the healthy strategy with the lowest median latency
+    (strategies without samples first, so all get measured) and fail over to the next one
+    on errors. With hedging, pay_async() also starts the payment on the second-best strategy
+    once the first has taken longer than its own p95 (or `hedge_after` seconds) and keeps
+    whichever result arrives first. Hedging sends the same payment twice, so it is only safe
+    when the payment backends deduplicate requests.
+    """
+
+    def __init__(self, strategies, hedge=False, hedge_after=None, window=200, failure_threshold=5, reset_timeout=5.0):
+        self.strategies = list(strategies)
+        self.hedge = hedge
+        self.hedge_after = hedge_after
+        self.latencies = {strategy: LatencyTracker(window) for strategy in self.strategies}
+        self.breakers = {strategy: CircuitBreaker(failure_threshold, reset_timeout) for strategy in self.strategies}
+        self.hedges = 0
+
+    def _ranked(self):
+        healthy = [strategy for strategy in self.strategies if self.breakers[strategy].available()]
+        return sorted(healthy, key=lambda strategy: self.latencies[strategy].percentile(0.5) or 0.0)
+
+    def _record(self, strategy, ticket, started, failed=False):
+        self.latencies[strategy].record(time.monotonic() - started)
+        if failed:
+            self.breakers[strategy].record_failure(ticket)
+        else:
+            self.breakers[strategy].record_success(ticket)
+
+    def pay(self, amount):
+        error = None
+        for strategy in self._ranked():
+            ticket = self.breakers[strategy].allow()
+            if ticket is None:
+                continue
+            started = time.monotonic()
+            try:
+                result = strategy.pay(amount)
+            except Exception as exception:
+                self._record(strategy, ticket, started, failed=True)
+                error = exception
+                continue
+            self._record(strategy, ticket, started)
+            return result
+        raise RuntimeError("No payment strategy available") from error
+
+    def _hedge_delay(self, strategy):
+        if self.hedge_after is not None:
+            return self.hedge_after
+        return self.latencies[strategy].percentile(0.95)
+
+    def _start(self, strategy, amount):
+        # A task paying with the strategy, or None when its circuit breaker refuses
+        ticket = self.breakers[strategy].allow()
+        if ticket is None:
+            return None
+        return asyncio.create_task(self._attempt(strategy, ticket, amount))
+
+    async def _attempt(self, strategy, ticket, amount):
+        started = time.monotonic()
+        try:
+            result = await strategy.pay_async(amount)
+        except asyncio.CancelledError:
+            # Lost a hedged race: it took at least this long, which is worth remembering
+            self.latencies[strategy].record(time.monotonic() - started)
+            self.breakers[strategy].abandon(ticket)
+            raise
+        except Exception:
+            self._record(strategy, ticket, started, failed=True)
+            raise
+        self._record(strategy, ticket, started)
+        return result
+
+    async def pay_async(self, amount):
+        candidates = deque(self._ranked())
+        if not candidates:
+            raise RuntimeError("No payment strategy available")
+        pending = set()
+        error = None
+        try:
+            while candidates or pending:
+                if not pending:
+                    strategy = candidates.popleft()
+                    task = self._start(strategy, amount)
+                    if task is None:
+                        continue
+                    pending.add(task)
+                    delay = self._hedge_delay(strategy) if self.hedge and candidates else None
+                else:
+                    delay = None
+                done, pending = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                while not done and candidates:
+                    task = self._start(candidates.popleft(), amount)
+                    if task is not None:
+                        self.hedges += 1
+                        pending.add(task)
+                        break
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise RuntimeError("All payment strategies failed") from error
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+# Concrete strategy simulating a payment provider with variable latency and failures
+class SimulatedPayment(PaymentStrategy):
+    def __init__(self, name, latency=0.005, spike_latency=0.2, spike_rate=0.0, failure_rate=0.0, seed=None):
+        self.name = name
+        self.latency = latency
+        self.spike_latency = spike_latency
+        self.spike_rate = spike_rate
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+
+    def _delay(self):
+        if self._random.random() < self.failure_rate:
+            raise ConnectionError(f"{self.name} is unavailable")
+        if self._random.random() < self.spike_rate:
+            return self.spike_latency
+        return self.latency * self._random.uniform(0.5, 1.5)
+
+    def pay(self, amount):
+        time.sleep(self._delay())
+        return self.name
+
+    async def pay_async(self, amount):
+        await asyncio.sleep(self._delay())
+        return self.name
+
+# Helper function converting a price in dollars (int, str, Decimal or float) to integer cents
+def to_cents(price):
+    cents = Decimal(str(price)) * 100
+    if cents != cents.to_integral_value():
+        raise ValueError(f"Price {price!r} has fractions of a cent")
+    return int(cents)
+
+# Line item in a shopping cart, prices in integer cents
+class LineItem:
+    __slots__ = ("sku", "unit_price_cents", "quantity")
+
+    def __init__(self, sku, unit_price_cents, quantity):
+        self.sku = sku
+        self.unit_price_cents = unit_price_cents
+        self.quantity = quantity
+
+    @property
+    def total_cents(self):
+        return self.unit_price_cents * self.quantity
+
 # Context class
 class ShoppingCart:
     def __init__(self, payment_strategy):
         self.payment_strategy = payment_strategy
+        self._items = {}  # SKU -> LineItem
+        self._total_cents = 0  # Running total, updated on every change
+
+    def add_item(self, sku, unit_price, quantity=1):
+        # Adding a SKU that is already in the cart increases its quantity at the existing price
+        item = self._items.get(sku)
+        if item is None:
+            item = self._items[sku] = LineItem(sku, to_cents(unit_price), 0)
+        item.quantity += quantity
+        self._total_cents += item.unit_price_cents * quantity
+
+    def remove_item(self, sku):
+        item = self._items.pop(sku)
+        self._total_cents -= item.total_cents
+
+    def set_quantity(self, sku, quantity):
+        if quantity == 0:
+            self.remove_item(sku)
+            return
+        item = self._items[sku]
+        self._total_cents += item.unit_price_cents * (quantity - item.quantity)
+        item.quantity = quantity
+
+    def line_items(self):
+        return list(self._items.values())
+
+    @property
+    def total_cents(self):
+        return self._total_cents
 
     def calculate_total(self):
-        # Assume some logic to calculate the total amount in the shopping cart
-        return 100  # Sample total amount
+        return Decimal(self._total_cents).scaleb(-2)
 
     def checkout(self):
         total_amount = self.calculate_total()
         self.payment_strategy.pay(total_amount)
 
+# Token bucket limiting how many requests per second go to one gateway
+class RateLimiter:
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = max(1, burst or rate)  # A bucket smaller than one token would never allow a request
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+# Pool of open connections to one payment gateway
+class GatewayConnectionPool:
+    def __init__(self, host, port, size=10):
+        self.host = host
+        self.port = port
+        self._slots = asyncio.Semaphore(size)
+        self._idle = []
+        self.connections_opened = 0
+
+    async def request(self, line):
+        # Sends one request line and returns the response line, reusing an idle connection
+        async with self._slots:
+            if self._idle:
+                reader, writer = self._idle.pop()
+            else:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+                self.connections_opened += 1
+            try:
+                writer.write(line)
+                await writer.drain()
+                response = await reader.readline()
+                if not response:
+                    raise ConnectionError("Gateway closed the connection")
+            except BaseException:
+                writer.close()
+                raise
+            self._idle.append((reader, writer))
+            return response
+
+    async def close(self):
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        await asyncio.gather(*(writer.wait_closed() for _, writer in idle), return_exceptions=True)
+
+# Checkout of many carts through pooled gateway connections
+class PooledCheckoutRunner:
+    """
+    Pays for many carts concurrently. Each payment strategy type is mapped to a gateway
+    address; payments go over a per-gateway connection pool, at most `concurrency` are in
+    flight overall and each gateway receives at most `rate_limit` requests per second.
+    Gateways speak a line protocol: "PAY <method> <account> <amount>" answered by "OK <id>",
+    and the strategies build their request lines with gateway_request().
+    """
+
+    def __init__(self, gateways, concurrency=100, pool_size=20, rate_limit=None):
+        for strategy_type in gateways:
+            if not hasattr(strategy_type, "gateway_request"):
+                raise TypeError(f"{strategy_type.__name__} does not support payment gateways")
+        self._pools = {strategy_type: GatewayConnectionPool(host, port, pool_size)
+                       for strategy_type, (host, port) in gateways.items()}
+        self._limiters = {strategy_type: RateLimiter(rate_limit) if rate_limit else None for strategy_type in gateways}
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def pay(self, strategy, amount):
+        strategy_type = type(strategy)
+        if strategy_type not in self._pools:
+            raise ValueError(f"No payment gateway configured for {strategy_type.__name__}")
+        async with self._semaphore:
+            limiter = self._limiters[strategy_type]
+            if limiter is not None:
+                await limiter.acquire()
+            response = await self._pools[strategy_type].request(strategy.gateway_request(amount))
+        status, _, transaction = response.decode().strip().partition(" ")
+        if status != "OK":
+            raise RuntimeError(f"Payment of ${amount} failed: {response.decode().strip()}")
+        return transaction
+
+    async def checkout(self, carts):
+        # Returns the gateway's transaction id for every cart, in order
+        return await asyncio.gather(*(self.pay(cart.payment_strategy, cart.calculate_total()) for cart in carts))
+
+    def connections_opened(self):
+        return sum(pool.connections_opened for pool in self._pools.values())
+
+    async def close(self):
+        await asyncio.gather(*(pool.close() for pool in self._pools.values()))
+
+# Local stand-in for a payment gateway, used to exercise PooledCheckoutRunner
+class StubGateway:
+    def __init__(self, latency=0.002):
+        self.latency = latency
+        self.payments = 0
+        self.connections = 0
+        self.port = None
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while line := await reader.readline():
+                await asyncio.sleep(self.latency)
+                self.payments += 1
+                writer.write(f"OK txn-{self.payments}\n".encode() if line.startswith(b"PAY ") else b"ERROR bad request\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+# Helper function totalling many carts at once from their line items
+def price_carts(carts):
+    """
+    Recomputes the totals of many carts from their line items, in integer cents. With NumPy
+    all prices and quantities go into two int64 arrays, are multiplied in one step and summed
+    per cart through a cumulative sum. Without NumPy it falls back to summing per cart.
+    """
+    if np is None:
+        return [sum(item.unit_price_cents * item.quantity for item in cart.line_items()) for cart in carts]
+    items = [cart.line_items() for cart in carts]
+    counts = np.fromiter((len(cart_items) for cart_items in items), dtype=np.int64, count=len(items))
+    line_count = int(counts.sum())
+    prices = np.fromiter((item.unit_price_cents for cart_items in items for item in cart_items),
+                         dtype=np.int64, count=line_count)
+    quantities = np.fromiter((item.quantity for cart_items in items for item in cart_items),
+                             dtype=np.int64, count=line_count)
+    return batch_totals(prices, quantities, counts).tolist()
+
+def batch_totals(prices_cents, quantities, line_counts):
+    # prices_cents and quantities hold the lines of all carts back to back; line_counts[i] is
+    # the number of lines of cart i. Requires NumPy; all arithmetic is exact int64.
+    running = np.concatenate(([0], np.cumsum(prices_cents * quantities, dtype=np.int64)))
+    ends = np.cumsum(line_counts)
+    return running[ends] - running[ends - line_counts]
+
+# Benchmark: checkout totals from Python objects vs. running totals vs. NumPy batch pricing
+def benchmark_totals(carts=1_000, lines=1_000):
+    rng = random.Random(42)
+    cart_list = []
+    for _ in range(carts):
+        cart = ShoppingCart(None)
+        for line in range(lines):
+            cart.add_item(f"SKU-{line}", f"{rng.randrange(1, 100_000) / 100:.2f}", rng.randrange(1, 5))
+        cart_list.append(cart)
+
+    start = time.perf_counter()
+    summed = [sum(item.unit_price_cents * item.quantity for item in cart.line_items()) for cart in cart_list]
+    print(f"sum of line item objects: {carts / (time.perf_counter() - start):>12,.0f} checkouts/s")
+
+    start = time.perf_counter()
+    running = [cart.total_cents for cart in cart_list]
+    print(f"running total:            {carts / (time.perf_counter() - start):>12,.0f} checkouts/s")
+    assert running == summed
+
+    if np is None:
+        print("NumPy is not installed, skipping batch pricing")
+        return
+    prices = np.fromiter((item.unit_price_cents for cart in cart_list for item in cart.line_items()), dtype=np.int64)
+    quantities = np.fromiter((item.quantity for cart in cart_list for item in cart.line_items()), dtype=np.int64)
+    counts = np.full(carts, lines, dtype=np.int64)
+    start = time.perf_counter()
+    batched = batch_totals(prices, quantities, counts)
+    print(f"NumPy batch_totals():     {carts / (time.perf_counter() - start):>12,.0f} checkouts/s")
+    assert batched.tolist() == summed
+
+# Benchmark: one connection per payment, sequentially, vs. the pooled concurrent runner
+def benchmark_pooled_checkout(payments=2_000, latency=0.002, concurrency=(10, 100), rate_limit=None):
+    card = CreditCardPayment("1234 5678 9012 3456", "12/25", "123")
+    paypal = PayPalPayment("example@example.com", "password")
+    carts = []
+    for index in range(payments):
+        cart = ShoppingCart(card if index % 2 else paypal)
+        cart.add_item("Item", "19.99")
+        carts.append(cart)
+
+    async def run():
+        card_gateway = await StubGateway(latency).start()
+        paypal_gateway = await StubGateway(latency).start()
+        gateways = {CreditCardPayment: ("127.0.0.1", card_gateway.port),
+                    PayPalPayment: ("127.0.0.1", paypal_gateway.port)}
+
+        sample = carts[:payments // 10]
+        start = time.perf_counter()
+        for cart in sample:
+            host, port = gateways[type(cart.payment_strategy)]
+            reader, writer = await asyncio.open_connection(host, port)
+            writer.write(cart.payment_strategy.gateway_request(cart.calculate_total()))
+            await writer.drain()
+            await reader.readline()
+            writer.close()
+            await writer.wait_closed()
+        print(f"sequential, new connection each: {len(sample) / (time.perf_counter() - start):>10,.0f} payments/s")
+
+        for limit in concurrency:
+            runner = PooledCheckoutRunner(gateways, concurrency=limit, rate_limit=rate_limit)
+            start = time.perf_counter()
+            transactions = await runner.checkout(carts)
+            elapsed = time.perf_counter() - start
+            assert len(transactions) == payments
+            print(f"pooled runner, concurrency {limit:>4}: {payments / elapsed:>10,.0f} payments/s "
+                  f"over {runner.connections_opened()} connections")
+            await runner.close()
+
+        await card_gateway.close()
+        await paypal_gateway.close()
+
+    asyncio.run(run())
+
+# Benchmark: p99 checkout latency with a provider whose latency spikes
+def benchmark_router(payments=2_000, concurrency=50):
+    def providers():
+        return (SimulatedPayment("spiky", latency=0.005, spike_latency=0.25, spike_rate=0.05, seed=1),
+                SimulatedPayment("steady", latency=0.008, seed=2))
+
+    async def run(strategy):
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+
+        async def pay_one():
+            async with semaphore:
+                start = time.perf_counter()
+                await strategy.pay_async(1)
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(pay_one() for _ in range(payments)))
+        latencies.sort()
+        return statistics.median(latencies), latencies[int(len(latencies) * 0.99)]
+
+    spiky, _ = providers()
+    scenarios = [("spiky provider only", spiky),
+                 ("router", RouterPayment(providers())),
+                 ("router with hedging", RouterPayment(providers(), hedge=True))]
+    for name, strategy in scenarios:
+        p50, p99 = asyncio.run(run(strategy))
+        hedges = f" ({strategy.hedges} hedged)" if isinstance(strategy, RouterPayment) and strategy.hedge else ""
+        print(f"{name:<22} p50 {p50 * 1000:>7.1f} ms | p99 {p99 * 1000:>7.1f} ms{hedges}")
+
 # Example usage
 if __name__ == "__main__":
     credit_card_payment = CreditCardPayment("1234 5678 9012 3456", "12/25", "123")
     paypal_payment = PayPalPayment("example@example.com", "password")
 
     cart1 = ShoppingCart(credit_card_payment)
+    cart1.add_item("Python book", "39.99")
+    cart1.add_item("Coffee mug", "12.00", quantity=2)
+    cart1.set_quantity("Coffee mug", 5)
+    cart1.add_item("Sticker", "0.01")
     cart2 = ShoppingCart(paypal_payment)
+    cart2.add_item("Keyboard", "100.00")
+
+    cart1.checkout()  # Output: Paying $100.00 with Credit Card: 1234 5678 9012 3456
+    cart2.checkout()  # Output: Paying $100.00 with PayPal: example@example.com
+
+    # Batch and asynchronous payments through the same strategies
+    credit_card_payment.pay_batch([10, 20])  # Output: Paying $10 ... Paying $20 with Credit Card: ...
 
-    cart1.checkout()  # Output: Paying $100 with Credit Card: 1234 5678 9012 3456
-    cart2.checkout()  # Output: Paying $100 with PayPal: example@example.com
+    # A router choosing between strategies; the first call tries each of them until one works
+    router = RouterPayment([SimulatedPayment("provider A", failure_rate=1.0), SimulatedPayment("provider B")])
+    print("Paid with", router.pay(100))  # Output: Paid with provider B
+
+    if "--benchmark" in sys.argv[1:]:
+        benchmark_totals()
+        benchmark_pooled_checkout()
+        benchmark_router()
 
 
 
@@ -67,4 +628,10 @@ In this example, we have an abstract PaymentStrategy class, which serves as the
 The ShoppingCart class serves as the context that uses a payment strategy during the checkout process. The client code can create instances of the ShoppingCart and provide different payment strategies based on the desired payment method.
 
 By using the Strategy pattern, we can easily add new payment methods without modifying the existing code. It allows for a more maintainable and flexible design, making it easier to extend and modify the payment system.
+
+The shopping cart stores its line items with prices in integer cents and keeps a running total, so adding, removing or changing the quantity of an item updates the total in constant time and checkout does not have to sum the items again. price_carts() recomputes the totals of many carts at once; with NumPy it multiplies and sums all line items as integer arrays.
+
+Besides pay(), every strategy offers pay_batch() and an asyncio pay_async(). For high volumes, PooledCheckoutRunner sends the payments of many carts to a payment gateway concurrently: connections to each gateway are pooled and reused, a semaphore limits how many payments are in flight, and a token bucket caps the request rate per gateway. StubGateway is a small local server that stands in for a real gateway.
+
+RouterPayment is itself a strategy, so a ShoppingCart can use it like any other. It keeps rolling latency statistics and a circuit breaker for each strategy it wraps, sends payments to the fastest healthy one and can hedge slow payments by also starting them on the next strategy.
 """
\ No newline at end of file
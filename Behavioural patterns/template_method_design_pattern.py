@@ -6,14 +6,76 @@ The Template Method design pattern is a behavioral pattern that defines the skel
 Let's create an example of the Template Method pattern for a simple recipe application. We'll have an abstract class Recipe representing the template of a cooking recipe, with specific steps such as prepare_ingredients(), cook(), and serve(). Concrete recipe classes like PastaRecipe and CakeRecipe will inherit from Recipe and provide their implementations for the specific steps.
 """
 
+import copy
+import queue
+import sys
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 # Abstract Class - Recipe
 class Recipe(ABC):
-    def prepare_recipe(self):
-        self.prepare_ingredients()
-        self.cook()
-        self.serve()
+    steps = ("prepare_ingredients", "cook", "serve")
+    # Step -> steps it needs to run first. None means every step needs the one before it.
+    step_dependencies = None
+
+    def prepare_recipe(self, parallel=False, max_workers=None):
+        # By default the steps run one after another; with parallel=True steps whose
+        # dependencies are done run concurrently on a thread pool
+        self.step_results = {}
+        if not parallel:
+            for step in self.steps:
+                self.run_step(step)
+            return
+        self._run_steps_concurrently(max_workers)
+
+    def run_step(self, step):
+        # Steps may return a result, which later steps can read from self.step_results
+        self.step_results[step] = getattr(self, step)()
+
+    def cache_key(self, step):
+        # Hashable description of everything a step's result depends on, so that
+        # RecipeBatchRunner can reuse the result for other recipes. None disables caching.
+        return None
+
+    def _dependency_graph(self):
+        if self.step_dependencies is None:
+            return {step: {previous} if previous else set()
+                    for previous, step in zip((None,) + tuple(self.steps), self.steps)}
+        graph = {step: set(self.step_dependencies.get(step, ())) for step in self.steps}
+        for step, needs in graph.items():
+            unknown = needs - graph.keys()
+            if unknown:
+                raise ValueError(f"Step {step!r} depends on unknown steps {sorted(unknown)}")
+        # Reject cycles before anything runs
+        done = set()
+        while len(done) < len(graph):
+            ready = {step for step, needs in graph.items() if step not in done and needs <= done}
+            if not ready:
+                raise ValueError(f"Dependency cycle between steps {sorted(graph.keys() - done)}")
+            done |= ready
+        return graph
+
+    def _run_steps_concurrently(self, max_workers):
+        waiting = self._dependency_graph()
+        dependents = {step: [] for step in waiting}
+        for step, needs in waiting.items():
+            for need in needs:
+                dependents[need].append(step)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            running = {}
+            while waiting or running:
+                for step in [step for step, needs in waiting.items() if not needs]:
+                    del waiting[step]
+                    running[executor.submit(self.run_step, step)] = step
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    future.result()  # Re-raises a failed step; steps depending on it never start
+                    for dependent in dependents[step]:
+                        waiting[dependent].discard(step)
 
     @abstractmethod
     def prepare_ingredients(self):
@@ -49,6 +111,220 @@ class CakeRecipe(Recipe):
     def serve(self):
         print("Serve delicious cake.")
 
+# Concrete Class - DinnerRecipe with independent, I/O-bound steps
+class DinnerRecipe(Recipe):
+    steps = ("prepare_ingredients", "boil_water", "preheat_oven", "make_sauce", "cook", "serve")
+    step_dependencies = {
+        "make_sauce": ("prepare_ingredients",),
+        "cook": ("boil_water", "preheat_oven", "make_sauce"),
+        "serve": ("cook",),
+    }
+
+    def __init__(self, durations=None):
+        # Seconds each step waits, standing in for I/O such as calls to other services
+        self.durations = durations or {"prepare_ingredients": 0.05, "boil_water": 0.10, "preheat_oven": 0.15,
+                                       "make_sauce": 0.05, "cook": 0.05, "serve": 0.01}
+
+    def _wait(self, step):
+        time.sleep(self.durations[step])
+
+    def prepare_ingredients(self):
+        self._wait("prepare_ingredients")
+
+    def boil_water(self):
+        self._wait("boil_water")
+
+    def preheat_oven(self):
+        self._wait("preheat_oven")
+
+    def make_sauce(self):
+        self._wait("make_sauce")
+
+    def cook(self):
+        self._wait("cook")
+
+    def serve(self):
+        self._wait("serve")
+
+# Concrete Class - SoupRecipe, whose ingredient preparation depends only on its vegetables
+class SoupRecipe(Recipe):
+    def __init__(self, vegetables, prepare_time=0.02, cook_time=0.005):
+        self.vegetables = vegetables
+        self.prepare_time = prepare_time
+        self.cook_time = cook_time
+
+    def prepare_ingredients(self):
+        time.sleep(self.prepare_time)
+        return sorted(f"chopped {vegetable}" for vegetable in self.vegetables)
+
+    def cook(self):
+        time.sleep(self.cook_time)
+        return f"soup with {', '.join(self.step_results['prepare_ingredients'])}"
+
+    def serve(self):
+        return f"Serve {self.step_results['cook']}."
+
+    def cache_key(self, step):
+        if step == "prepare_ingredients":
+            return tuple(sorted(self.vegetables))
+        return None
+
+# Bounded LRU cache of step results, copied in and out so recipes cannot change each other's results
+class StepCache:
+    _MISSING = object()
+
+    def __init__(self, maxsize=1_024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        # Returns StepCache._MISSING when the key is not cached
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                value = self._entries[key]
+            else:
+                self.misses += 1
+                return self._MISSING
+        return copy.deepcopy(value)
+
+    def put(self, key, value):
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize}
+
+# Runs many recipes as an assembly line, one stage per step
+class RecipeBatchRunner:
+    """
+    Each step of the template is a pipeline stage with its own worker threads and a bounded
+    queue in front of it, so while one recipe is cooked the next one is already having its
+    ingredients prepared. Slow stages can get more workers via `workers`, e.g.
+    {"cook": 4}. Step results are cached by (step, recipe.cache_key(step)) in an LRU cache,
+    and every step reports its duration to the registered hooks as
+    hook(recipe, step, seconds, cached).
+
+    A step is not locked while it runs, so with several workers on a stage, recipes with the
+    same key can miss at the same time and both compute the result: the cache's miss count
+    may then be higher than the number of distinct keys.
+    """
+
+    _DONE = object()
+
+    def __init__(self, cache_size=1_024, workers=None, queue_size=64):
+        self.cache = StepCache(cache_size)
+        self.workers = workers or {}
+        self.queue_size = queue_size
+        self.timings = {}  # Step -> [calls, total seconds]
+        self._timings_lock = threading.Lock()
+        self._hooks = []
+
+    def add_hook(self, hook):
+        self._hooks.append(hook)
+
+    def _run_step(self, recipe, step):
+        start = time.perf_counter()
+        key = recipe.cache_key(step)
+        result = StepCache._MISSING if key is None else self.cache.get((step, key))
+        cached = result is not StepCache._MISSING
+        if cached:
+            recipe.step_results[step] = result
+        else:
+            recipe.run_step(step)
+            if key is not None:
+                self.cache.put((step, key), recipe.step_results[step])
+        elapsed = time.perf_counter() - start
+        with self._timings_lock:
+            timing = self.timings.setdefault(step, [0, 0.0])
+            timing[0] += 1
+            timing[1] += elapsed
+        for hook in self._hooks:
+            hook(recipe, step, elapsed, cached)
+
+    def _stage(self, step, inbox, outbox):
+        while (item := inbox.get()) is not self._DONE:
+            recipe, error = item
+            if error is None:
+                try:
+                    self._run_step(recipe, step)
+                except Exception as exception:
+                    error = exception  # Later stages skip this recipe
+            outbox.put((recipe, error))
+
+    def run(self, recipes):
+        # Returns the step results of every recipe, in order; raises the first failure
+        recipes = list(recipes)
+        if not recipes:
+            return []
+        steps = recipes[0].steps
+        if any(recipe.steps != steps for recipe in recipes):
+            raise ValueError("All recipes in a batch must have the same steps")
+        for recipe in recipes:
+            recipe.step_results = {}
+
+        queues = [queue.Queue(self.queue_size) for _ in steps] + [queue.Queue()]
+        stages = []
+        for index, step in enumerate(steps):
+            threads = [threading.Thread(target=self._stage, args=(step, queues[index], queues[index + 1]), daemon=True)
+                       for _ in range(self.workers.get(step, 1))]
+            for thread in threads:
+                thread.start()
+            stages.append(threads)
+
+        for recipe in recipes:
+            queues[0].put((recipe, None))
+        for index, threads in enumerate(stages):
+            for _ in threads:
+                queues[index].put(self._DONE)
+            for thread in threads:
+                thread.join()
+
+        errors = {}
+        while not queues[-1].empty():
+            recipe, error = queues[-1].get()
+            if error is not None:
+                errors[id(recipe)] = error
+        for recipe in recipes:
+            if id(recipe) in errors:
+                raise errors[id(recipe)]
+        return [recipe.step_results for recipe in recipes]
+
+# Benchmark: end-to-end latency of sequential vs. dependency-aware parallel steps
+def benchmark_parallel_steps(runs=5):
+    recipe = DinnerRecipe()
+    for name, parallel in (("sequential", False), ("parallel", True)):
+        start = time.perf_counter()
+        for _ in range(runs):
+            recipe.prepare_recipe(parallel=parallel)
+        print(f"{name:<10} {(time.perf_counter() - start) / runs * 1000:>7.1f} ms per recipe")
+
+# Benchmark: many recipes one by one vs. the pipelined batch runner with caching
+def benchmark_batch_runner(recipes=200, distinct_inputs=10):
+    def batch():
+        return [SoupRecipe([f"vegetable {index % distinct_inputs}", "onion"]) for index in range(recipes)]
+
+    start = time.perf_counter()
+    for recipe in batch():
+        recipe.prepare_recipe()
+    print(f"one by one:              {recipes / (time.perf_counter() - start):>8,.0f} recipes/s")
+
+    for workers in ({}, {"cook": 4}):
+        runner = RecipeBatchRunner(workers=workers)
+        start = time.perf_counter()
+        runner.run(batch())
+        elapsed = time.perf_counter() - start
+        timings = ", ".join(f"{step} {total / calls * 1000:.1f} ms" for step, (calls, total) in runner.timings.items())
+        print(f"batch runner {str(workers):<11} {recipes / elapsed:>8,.0f} recipes/s | {runner.cache.stats()} | {timings}")
+
 # Client code
 if __name__ == "__main__":
     print("Preparing Pasta Recipe:")
@@ -59,6 +335,22 @@ if __name__ == "__main__":
     cake_recipe = CakeRecipe()
     cake_recipe.prepare_recipe()
 
+    print("\nPreparing Dinner Recipe with parallel steps:")
+    start = time.perf_counter()
+    DinnerRecipe().prepare_recipe(parallel=True)
+    print(f"Done in {time.perf_counter() - start:.2f} s")  # Output: about 0.21 s instead of 0.41 s
+
+    print("\nPreparing Soup Recipes in a batch:")
+    runner = RecipeBatchRunner(cache_size=16)
+    soups = [SoupRecipe(["carrot", "leek"]), SoupRecipe(["tomato"]), SoupRecipe(["leek", "carrot"])]
+    for results in runner.run(soups):
+        print(results["serve"])  # Output: Serve soup with chopped carrot, chopped leek. ...
+    print(runner.cache.stats())  # Output: {'hits': 1, 'misses': 2, 'size': 2, 'maxsize': 16}
+
+    if "--benchmark" in sys.argv[1:]:
+        benchmark_parallel_steps()
+        benchmark_batch_runner()
+
 
 
 
@@ -70,4 +362,8 @@ In this example, the Recipe class is the abstract class representing the templat
 The PastaRecipe and CakeRecipe classes inherit from Recipe and provide their implementations for the abstract methods. They override the prepare_ingredients(), cook(), and serve() methods to define the specific steps needed to prepare pasta and cake recipes.
 
 When the client code prepares a recipe, it calls the prepare_recipe() method of the corresponding recipe object (PastaRecipe or CakeRecipe). The template method prepare_recipe() takes care of the overall flow, while the concrete classes implement the specific steps based on the recipe type.
+
+A recipe can also declare which of its steps depend on each other in step_dependencies, as DinnerRecipe does. prepare_recipe(parallel=True) then runs every step as soon as the steps it depends on are finished, so independent steps such as boiling water and preheating the oven overlap. Without the argument, or for recipes that declare no dependencies, the steps still run in their usual order.
+
+To run the same template over many inputs, RecipeBatchRunner turns the steps into an assembly line: every step is a stage with its own worker threads, so different recipes are in different stages at the same time. Steps whose results only depend on the recipe's inputs can return a cache_key(), and the runner then reuses their results from an LRU cache instead of running them again.
 """